@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Frosted blur benchmark: legacy pure-Python blur vs the running-sum engine.
+
+    python3 benchmarks/bench_blur.py [--rows N]
+
+The legacy blur is far too slow to run on a full 4K frame, so it is timed
+on a strip of N rows and extrapolated (its cost is linear in the row count).
+Before timing, the new engine is checked pixel-for-pixel against a reference
+built from the legacy pass.
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+import lockscreen
+from lockscreen import _box_blur, BLUR_PASSES
+
+SIZES = [('1080p', 1920, 1080), ('1440p', 2560, 1440), ('4K', 3840, 2160)]
+RADIUS = 14
+
+
+def legacy_pass(src, dst, w, h, nc, rs, r):
+    """Horizontal pass of the original blur_pixbuf, verbatim."""
+    for y in range(h):
+        for x in range(w):
+            rs_v = rb_v = rg_v = ra_v = 0
+            cnt = 0
+            for dx in range(-r, r+1):
+                nx = max(0, min(w-1, x+dx))
+                off = y*rs + nx*nc
+                rs_v += src[off]
+                rg_v += src[off+1]
+                rb_v += src[off+2]
+                if nc == 4: ra_v += src[off+3]
+                cnt += 1
+            off = y*rs + x*nc
+            dst[off]   = rs_v // cnt
+            dst[off+1] = rg_v // cnt
+            dst[off+2] = rb_v // cnt
+            if nc == 4: dst[off+3] = ra_v // cnt
+
+
+def legacy_blur(px, w, h, nc, rs, r):
+    """The original blur: three horizontal-only passes."""
+    px = bytearray(px)
+    tmp = bytearray(len(px))
+    for _ in range(BLUR_PASSES):
+        legacy_pass(px, tmp, w, h, nc, rs, r)
+        px, tmp = tmp, px
+    return bytes(px)
+
+
+def _transpose(px, w, h, nc, rs, trs):
+    out = bytearray(w * trs)
+    for y in range(h):
+        for x in range(w):
+            out[x*trs + y*nc:x*trs + y*nc + nc] = px[y*rs + x*nc:y*rs + x*nc + nc]
+    return out
+
+
+def reference_blur(px, w, h, nc, rs, r):
+    """Legacy pass applied horizontally, then vertically via a transpose."""
+    trs = h * nc
+    px = bytearray(px)
+    tmp = bytearray(len(px))
+    for _ in range(BLUR_PASSES):
+        legacy_pass(px, tmp, w, h, nc, rs, r)
+        t = _transpose(tmp, w, h, nc, rs, trs)
+        t2 = bytearray(len(t))
+        legacy_pass(t, t2, h, w, nc, trs, r)
+        px = _transpose(t2, h, w, nc, trs, rs)
+    return bytes(px)
+
+
+def random_pixels(w, h, nc, rs, seed=1):
+    rnd = random.Random(seed)
+    return rnd.randbytes(h * rs)
+
+
+def check_exact():
+    r = max(1, RADIUS // 3)
+    for w, h, nc, pad in [(37, 23, 3, 1), (64, 48, 4, 0), (5, 90, 3, 3)]:
+        rs = w * nc + pad
+        px = random_pixels(w, h, nc, rs)
+        want = reference_blur(px, w, h, nc, rs, r)
+        for use_numpy in (False, True):
+            if use_numpy and lockscreen.np is None:
+                continue
+            got = _box_blur(px, w, h, nc, rs, r, use_numpy=use_numpy)
+            for y in range(h):
+                a = got[y*rs:y*rs + w*nc]
+                b = want[y*rs:y*rs + w*nc]
+                if a != b:
+                    sys.exit(f'MISMATCH {w}x{h}x{nc} numpy={use_numpy} row {y}')
+    print('pixel-exact check: OK')
+
+
+def _time(fn, *args):
+    t0 = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - t0
+
+
+def main():
+    rows = 8
+    if '--rows' in sys.argv:
+        rows = int(sys.argv[sys.argv.index('--rows') + 1])
+    check_exact()
+
+    r = max(1, RADIUS // 3)
+    nc = 3
+    print(f'radius={RADIUS} (per-pass r={r}), {BLUR_PASSES} passes, RGB')
+    print(f'{"size":>6} {"legacy*":>10} {"python":>10} {"numpy":>10}')
+    for name, w, h in SIZES:
+        rs = w * nc
+        strip = random_pixels(w, rows, nc, rs)
+        legacy = _time(legacy_blur, strip, w, rows, nc, rs, r) * h / rows
+        px = random_pixels(w, h, nc, rs)
+        py = _time(_box_blur, px, w, h, nc, rs, r, BLUR_PASSES, False)
+        npt = (_time(_box_blur, px, w, h, nc, rs, r) if lockscreen.np is not None
+               else float('nan'))
+        print(f'{name:>6} {legacy:>9.1f}s {py:>9.2f}s {npt:>9.3f}s')
+    print(f'* legacy extrapolated from {rows} rows; it only blurs horizontally')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Spotify EQ benchmark: the original 24 Gtk.Box bars animated by CSS
+@keyframes on min-height vs the single-widget EqWidget.
+
+    python3 benchmarks/bench_eq.py [--seconds N]
+
+Needs a graphical session.  Each variant runs in its own process in a small
+window for N seconds (default 10) and reports the CPU time that process
+used per second and the frames it drew; compositor/GPU time is not included.
+"paused" runs show what a paused or blanked EQ costs.
+"""
+
+import os
+import resource
+import subprocess
+import sys
+import time
+
+import gi
+gi.require_version('Gtk', '4.0')
+gi.require_version('Gdk', '4.0')
+from gi.repository import Gtk, Gdk, GLib
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+LEGACY_CSS = """
+.eq-bar { background-color:#1DB954; border-radius:2px 2px 0 0; margin-left:1px; margin-right:1px; }
+@keyframes eq-bounce-1  {0%{min-height:4px}  25%{min-height:18px} 50%{min-height:8px}  75%{min-height:14px} 100%{min-height:4px} }
+@keyframes eq-bounce-2  {0%{min-height:10px} 30%{min-height:4px}  60%{min-height:20px} 80%{min-height:6px}  100%{min-height:10px}}
+@keyframes eq-bounce-3  {0%{min-height:16px} 20%{min-height:6px}  50%{min-height:22px} 70%{min-height:10px} 100%{min-height:16px}}
+@keyframes eq-bounce-4  {0%{min-height:6px}  35%{min-height:20px} 55%{min-height:4px}  85%{min-height:16px} 100%{min-height:6px} }
+@keyframes eq-bounce-5  {0%{min-height:12px} 20%{min-height:22px} 45%{min-height:6px}  65%{min-height:18px} 100%{min-height:12px}}
+@keyframes eq-bounce-6  {0%{min-height:8px}  30%{min-height:14px} 55%{min-height:4px}  75%{min-height:20px} 100%{min-height:8px} }
+@keyframes eq-bounce-7  {0%{min-height:18px} 25%{min-height:6px}  50%{min-height:24px} 80%{min-height:8px}  100%{min-height:18px}}
+@keyframes eq-bounce-8  {0%{min-height:4px}  40%{min-height:16px} 60%{min-height:8px}  80%{min-height:20px} 100%{min-height:4px} }
+@keyframes eq-bounce-9  {0%{min-height:14px} 20%{min-height:4px}  50%{min-height:18px} 75%{min-height:10px} 100%{min-height:14px}}
+@keyframes eq-bounce-10 {0%{min-height:8px}  30%{min-height:22px} 55%{min-height:6px}  70%{min-height:16px} 100%{min-height:8px} }
+@keyframes eq-bounce-11 {0%{min-height:20px} 25%{min-height:8px}  50%{min-height:4px}  75%{min-height:18px} 100%{min-height:20px}}
+@keyframes eq-bounce-12 {0%{min-height:6px}  35%{min-height:24px} 60%{min-height:10px} 85%{min-height:4px}  100%{min-height:6px} }
+.eq-bar-1  {animation:eq-bounce-1  1.1s  ease-in-out infinite}
+.eq-bar-2  {animation:eq-bounce-2  0.9s  ease-in-out infinite}
+.eq-bar-3  {animation:eq-bounce-3  1.3s  ease-in-out infinite}
+.eq-bar-4  {animation:eq-bounce-4  0.8s  ease-in-out infinite}
+.eq-bar-5  {animation:eq-bounce-5  1.2s  ease-in-out infinite}
+.eq-bar-6  {animation:eq-bounce-6  1.0s  ease-in-out infinite}
+.eq-bar-7  {animation:eq-bounce-7  0.85s ease-in-out infinite}
+.eq-bar-8  {animation:eq-bounce-8  1.15s ease-in-out infinite}
+.eq-bar-9  {animation:eq-bounce-9  0.95s ease-in-out infinite}
+.eq-bar-10 {animation:eq-bounce-10 1.25s ease-in-out infinite}
+.eq-bar-11 {animation:eq-bounce-11 0.75s ease-in-out infinite}
+.eq-bar-12 {animation:eq-bounce-12 1.05s ease-in-out infinite}
+.eq-bar.paused { animation:none; min-height:3px; }
+"""
+
+
+def _legacy_eq():
+    """The original EQ row from _build_spotify_card, verbatim."""
+    eq_row = Gtk.Box(spacing=0)
+    eq_row.set_valign(Gtk.Align.END)
+    eq_row.set_halign(Gtk.Align.FILL)
+    eq_row.set_hexpand(True)
+    eq_row.set_size_request(-1, 28)
+    bars = []
+    for i in range(1, 25):
+        bar = Gtk.Box()
+        bar.add_css_class('eq-bar')
+        bar.add_css_class(f'eq-bar-{((i-1) % 12) + 1}')
+        bar.set_valign(Gtk.Align.END)
+        bar.set_hexpand(True)
+        eq_row.append(bar)
+        bars.append(bar)
+    return eq_row, bars
+
+
+def child(variant, seconds):
+    from lockscreen import EqWidget
+    prov = Gtk.CssProvider()
+    prov.load_from_data((LEGACY_CSS if variant.startswith('css')
+                         else '.eq-bar { color:#1DB954; }').encode())
+    Gtk.StyleContext.add_provider_for_display(
+        Gdk.Display.get_default(), prov, Gtk.STYLE_PROVIDER_PRIORITY_APPLICATION)
+
+    win = Gtk.Window(default_width=320, default_height=60)
+    if variant.startswith('css'):
+        row, bars = _legacy_eq()
+        if variant.endswith('paused'):
+            for bar in bars:
+                bar.add_css_class('paused')
+        win.set_child(row)
+    else:
+        eq = EqWidget()
+        eq.set_size_request(-1, 28)
+        win.set_child(eq)
+        if not variant.endswith('paused'):
+            win.connect('map', lambda *_: eq.set_active(True))
+
+    loop = GLib.MainLoop()
+    state = {}
+
+    def _start():
+        clock = win.get_frame_clock()
+        state['frames'] = clock.get_frame_counter()
+        state['cpu'] = resource.getrusage(resource.RUSAGE_SELF)
+        state['t'] = time.monotonic()
+        GLib.timeout_add(int(seconds * 1000), _stop)
+        return False
+
+    def _stop():
+        ru = resource.getrusage(resource.RUSAGE_SELF)
+        dt = time.monotonic() - state['t']
+        cpu = (ru.ru_utime + ru.ru_stime -
+               state['cpu'].ru_utime - state['cpu'].ru_stime)
+        frames = win.get_frame_clock().get_frame_counter() - state['frames']
+        print(f'{variant:>14}: {cpu / dt * 1000:7.1f} ms CPU/s  '
+              f'{frames / dt:6.1f} frames/s', flush=True)
+        loop.quit()
+        return False
+
+    win.present()
+    GLib.timeout_add(1000, _start)     # let startup settle first
+    loop.run()
+
+
+def main():
+    if '--child' in sys.argv:
+        i = sys.argv.index('--child')
+        child(sys.argv[i + 1], float(sys.argv[i + 2]))
+        return
+    seconds = 10.0
+    if '--seconds' in sys.argv:
+        seconds = float(sys.argv[sys.argv.index('--seconds') + 1])
+    for variant in ('css', 'widget', 'css-paused', 'widget-paused'):
+        subprocess.run([sys.executable, __file__, '--child', variant, str(seconds)],
+                       check=True)
+
+
+if __name__ == '__main__':
+    main()
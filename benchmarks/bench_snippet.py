@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+VSCodium snippet benchmark: the original readlines() implementation vs the
+tail-reading read_file_snippet, cold (first read) and cached (unchanged
+file, a single stat()).
+
+    python3 benchmarks/bench_snippet.py [--max-mb N]
+
+Files from 1 KB up to --max-mb (default 1024, i.e. 1 GB) are written to a
+temporary directory and removed afterwards.  The legacy reader is skipped
+above 256 MB, where it needs several GB of RAM.
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+import lockscreen
+from lockscreen import read_file_snippet
+
+LEGACY_MAX = 256 * 1024 * 1024
+
+
+def legacy_read_file_snippet(path, lines=18):
+    """Original read_file_snippet, verbatim."""
+    try:
+        with open(path, errors='replace') as f:
+            all_lines = f.readlines()
+        while all_lines and all_lines[-1].strip() == '':
+            all_lines.pop()
+        return ''.join(all_lines[-lines:])
+    except Exception:
+        return ''
+
+
+def _write(path, size):
+    line = b'    {"id": 12345, "name": "generated", "value": 3.14159},\n'
+    chunk = line * (1024 * 1024 // len(line) + 1)
+    with open(path, 'wb') as f:
+        left = size
+        while left > 0:
+            f.write(chunk[:left])
+            left -= len(chunk)
+
+
+def _time(fn, *args, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    max_mb = 1024
+    if '--max-mb' in sys.argv:
+        max_mb = int(sys.argv[sys.argv.index('--max-mb') + 1])
+    sizes = [1024 * 4 ** i for i in range(16) if 1024 * 4 ** i <= max_mb * 1024 * 1024]
+    if sizes[-1] < max_mb * 1024 * 1024:
+        sizes.append(max_mb * 1024 * 1024)
+
+    print(f'{"size":>10} {"legacy":>12} {"tail cold":>12} {"cached":>12}')
+    with tempfile.TemporaryDirectory() as d:
+        for size in sizes:
+            path = os.path.join(d, f'{size}.json')
+            _write(path, size)
+            if size <= LEGACY_MAX:
+                legacy = _time(legacy_read_file_snippet, path, repeat=1 if size > 1 << 26 else 3)
+                assert read_file_snippet(path) == legacy_read_file_snippet(path)
+                legacy_s = f'{legacy*1000:9.2f} ms'
+            else:
+                legacy_s = f'{"skipped":>12}'
+
+            def cold():
+                lockscreen._snippet_cache.clear()
+                read_file_snippet(path)
+            tail = _time(cold)
+            cached = _time(read_file_snippet, path)
+            label = f'{size / 1024:.0f} KB' if size < 1 << 20 else f'{size >> 20} MB'
+            print(f'{label:>10} {legacy_s:>12} {tail*1000:9.3f} ms {cached*1e6:9.1f} µs')
+            os.remove(path)
+
+
+if __name__ == '__main__':
+    main()
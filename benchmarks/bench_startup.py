@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Time-to-first-frame of the lock screen, cold start vs resident daemon.
+
+    python3 benchmarks/bench_startup.py [-n RUNS]
+
+Needs a graphical session and no other lock screen instance running.  Each
+lock is dismissed right after its first frame (FANCY_LOCKSCREEN_TIMING=dismiss).
+Cold runs are timed from fork to first frame; warm runs from the gdbus call
+that the fancy-lockscreen wrapper makes to the first frame.
+"""
+
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'lockscreen.py')
+ENV = {**os.environ, 'FANCY_LOCKSCREEN_TIMING': 'dismiss'}
+ACTIVATE = ['gdbus', 'call', '--session', '--dest', 'io.fancy.lockscreen',
+            '--object-path', '/io/fancy/lockscreen',
+            '--method', 'org.freedesktop.Application.Activate', '{}']
+_FRAME_RE = re.compile(r'\[timing\] first frame .* \(monotonic ([0-9.]+)\)')
+
+
+def _wait_frame(stream):
+    for line in stream:
+        m = _FRAME_RE.search(line)
+        if m:
+            return float(m.group(1))
+    raise RuntimeError('lock screen exited without drawing a frame')
+
+
+def cold(runs):
+    out = []
+    for _ in range(runs):
+        t0 = time.monotonic()
+        p = subprocess.Popen([sys.executable, SCRIPT], env=ENV,
+                             stderr=subprocess.PIPE, text=True)
+        out.append(_wait_frame(p.stderr) - t0)
+        p.wait(timeout=10)
+    return out
+
+
+def warm(runs):
+    out = []
+    daemon = subprocess.Popen([sys.executable, SCRIPT, '--daemon'], env=ENV,
+                              stderr=subprocess.PIPE, text=True)
+    try:
+        for _ in range(runs):
+            time.sleep(2)   # let the daemon prebuild the next window
+            t0 = time.monotonic()
+            subprocess.run(ACTIVATE, check=True, capture_output=True)
+            out.append(_wait_frame(daemon.stderr) - t0)
+    finally:
+        daemon.terminate()
+        daemon.wait(timeout=10)
+    return out
+
+
+def _report(name, samples):
+    ms = sorted(x * 1000 for x in samples)
+    print(f'{name:>5}: median {statistics.median(ms):7.1f} ms   '
+          f'min {ms[0]:7.1f} ms   max {ms[-1]:7.1f} ms   (n={len(ms)})')
+
+
+def main():
+    runs = 10
+    if '-n' in sys.argv:
+        runs = int(sys.argv[sys.argv.index('-n') + 1])
+    _report('cold', cold(runs))
+    _report('warm', warm(runs))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+System monitor benchmark: legacy get_sysmon vs the persistent SysmonSampler
+(psutil) vs its dependency-free /proc backend.
+
+    python3 benchmarks/bench_sysmon.py [--ticks N] [--spawn N]
+
+--spawn starts N idle `sleep` processes first, to mimic a busy desktop.
+Wall time includes the legacy sampler's 0.75 s of sleeps; CPU time is what
+each tick actually costs this process.
+"""
+
+import os
+import subprocess
+import sys
+import time
+
+import psutil
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from lockscreen import SysmonSampler, ProcSysmonSampler
+
+
+def legacy_get_sysmon():
+    """psutil branch of the original get_sysmon, verbatim."""
+    cpu   = psutil.cpu_percent(interval=0.25)
+    mem   = psutil.virtual_memory()
+    disk  = psutil.disk_usage('/')
+    net_1 = psutil.net_io_counters()
+    time.sleep(0.5)
+    net_2 = psutil.net_io_counters()
+    net_rx = (net_2.bytes_recv - net_1.bytes_recv) / 0.5
+    net_tx = (net_2.bytes_sent - net_1.bytes_sent) / 0.5
+    procs = []
+    for p in psutil.process_iter(['pid', 'name', 'cpu_percent', 'memory_percent']):
+        try:
+            procs.append(p.info)
+        except Exception:
+            pass
+    top = sorted(procs, key=lambda p: p.get('cpu_percent', 0), reverse=True)[:3]
+    return {'cpu': cpu, 'mem': mem, 'disk': disk,
+            'net_rx': net_rx, 'net_tx': net_tx, 'top_procs': top}
+
+
+def _measure(fn, ticks):
+    wall = cpu = 0.0
+    for _ in range(ticks):
+        w0, c0 = time.perf_counter(), time.process_time()
+        fn()
+        wall += time.perf_counter() - w0
+        cpu += time.process_time() - c0
+    return wall / ticks, cpu / ticks
+
+
+def main():
+    ticks, spawn = 5, 0
+    if '--ticks' in sys.argv:
+        ticks = int(sys.argv[sys.argv.index('--ticks') + 1])
+    if '--spawn' in sys.argv:
+        spawn = int(sys.argv[sys.argv.index('--spawn') + 1])
+    children = [subprocess.Popen(['sleep', '600']) for _ in range(spawn)]
+    try:
+        print(f'{len(psutil.pids())} processes, {ticks} ticks each')
+        sampler = SysmonSampler()
+        proc = ProcSysmonSampler()
+        for name, fn in [('legacy', legacy_get_sysmon), ('sampler', sampler.sample),
+                         ('/proc', proc.sample)]:
+            wall, cpu = _measure(fn, ticks)
+            print(f'{name:>8}: {wall*1000:8.1f} ms wall   {cpu*1000:8.1f} ms CPU per tick')
+    finally:
+        for c in children:
+            c.kill()
+            c.wait()
+
+
+if __name__ == '__main__':
+    main()
@@ -34,6 +34,12 @@ mkdir -p "$BIN_DIR"
 
 cat > "$BIN_DIR/fancy-lockscreen" << EOF
 #!/bin/bash
+# Resident mode: ask the prewarmed instance to show itself
+if [ \$# -eq 0 ] && gdbus call --session --dest io.fancy.lockscreen \\
+        --object-path /io/fancy/lockscreen \\
+        --method org.freedesktop.Application.Activate '{}' >/dev/null 2>&1; then
+    exit 0
+fi
 exec python3 "$INSTALL_DIR/lockscreen.py" "\$@"
 EOF
 chmod +x "$BIN_DIR/fancy-lockscreen"
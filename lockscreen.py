@@ -3,8 +3,10 @@
 import gi
 gi.require_version('Gtk', '4.0')
 gi.require_version('Gdk', '4.0')
+gi.require_version('Gsk', '4.0')
+gi.require_version('Graphene', '1.0')
 
-from gi.repository import Gtk, Gdk, GLib, Pango, Gio
+from gi.repository import Gtk, Gdk, GLib, GObject, Pango, Gio, Gsk, Graphene
 import subprocess
 import threading
 import json
@@ -12,10 +14,23 @@ import os
 import sys
 import datetime
 import time
+import hashlib
+import struct
+import collections
+import heapq
+import queue
 import dbus
+from dbus.mainloop.glib import DBusGMainLoop
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+DBusGMainLoop(set_as_default=True)
 
 
 CONFIG_PATH = os.path.expanduser('~/.config/fancy-lockscreen/config.json')
+CACHE_DIR   = os.path.expanduser('~/.cache/fancy-lockscreen')
 
 DEFAULT_CONFIG = {
     "background_image": "",
@@ -50,6 +65,10 @@ DEFAULT_CONFIG = {
     "media_widget_file": "",
     # Widget layout positions (list of widget ids in order)
     "widget_layout": ["weather", "sysmon", "notifications", "spotify", "vscodium", "media"],
+    # Keep a prebuilt lock screen in memory (lockscreen.py --daemon)
+    "resident_mode": False,
+    # Drive the Spotify EQ from the audio output (GStreamer spectrum)
+    "eq_spectrum": False,
 }
 
 def load_config():
@@ -81,6 +100,8 @@ _STRINGS = {
         'no_api_key':      'НЕТ API КЛЮЧА',
         'feels':           'ощущается',
         'humidity':        'влажность',
+        'ago_min':         '{} мин назад',
+        'ago_hr':          '{} ч назад',
         # Sysmon card
         'sysmon_hdr':      'СИСТЕМА',
         'top_procs':       'TOP ПРОЦЕССЫ',
@@ -102,6 +123,7 @@ _STRINGS = {
         'hint_checking':   'Проверяю…',
         'hint_welcome':    '✓ Добро пожаловать!',
         'hint_wrong':      'Неверный пароль (попытка {})',
+        'hint_auth_error': 'Не удалось проверить пароль — попробуйте ещё раз',
     },
     'en': {
         # Clock / date
@@ -115,6 +137,8 @@ _STRINGS = {
         'no_api_key':      'NO API KEY',
         'feels':           'feels like',
         'humidity':        'humidity',
+        'ago_min':         '{} min ago',
+        'ago_hr':          '{} h ago',
         # Sysmon card
         'sysmon_hdr':      'SYSTEM',
         'top_procs':       'TOP PROCESSES',
@@ -136,6 +160,7 @@ _STRINGS = {
         'hint_checking':   'Checking…',
         'hint_welcome':    '✓ Welcome!',
         'hint_wrong':      'Wrong password (attempt {})',
+        'hint_auth_error': "Couldn't check the password — try again",
     },
 }
 
@@ -165,6 +190,130 @@ def get_tod_image(cfg):
         return path, dim
     return cfg.get('background_image', ''), cfg.get('dim_level', 0.45)
 
+# ─── Scheduler ───────────────────────────────────────────────────────────────
+
+class WidgetScheduler:
+    """
+    Bounded pool of daemon worker threads for background fetches.  At most
+    one job per key is in flight: a tick that finds its previous job still
+    running is skipped.  A job that outlives its timeout gets on_timeout
+    and its eventual result is dropped, but its key stays busy until the
+    worker returns, so a hung job never runs twice or takes more than one
+    worker.  submit() and the callbacks run on the GLib main loop.
+
+    every() registers a periodic widget pipeline: fetch runs on a worker,
+    and apply is only called when the result differs from the last one.
+    """
+
+    def __init__(self, workers=4, max_queued=16):
+        self.max_queued = max_queued
+        self.stats = {'submitted': 0, 'skipped': 0, 'timed_out': 0,
+                      'late': 0, 'failed': 0, 'applied': 0, 'unchanged': 0}
+        self._queue = queue.Queue()
+        self._inflight = {}     # key -> token
+        self._expired = set()   # tokens past their timeout, still running
+        self._last = {}         # key -> last result handed to apply
+        self._timers = []
+        self._next_token = 0
+        self._closed = False
+        self._workers = [threading.Thread(target=self._work, daemon=True)
+                         for _ in range(workers)]
+        for t in self._workers:
+            t.start()
+
+    def busy(self, key):
+        return key in self._inflight
+
+    def counts(self):
+        return {**self.stats, 'in_flight': len(self._inflight),
+                'queued': self._queue.qsize()}
+
+    def submit(self, key, fn, *args, timeout=None, on_done=None, on_timeout=None):
+        """Queue fn(*args); on_done(result) is called on the main loop."""
+        if self._closed:
+            return False
+        if key in self._inflight or self._queue.qsize() >= self.max_queued:
+            self.stats['skipped'] += 1
+            return False
+        self._next_token += 1
+        token = self._next_token
+        self._inflight[key] = token
+        self.stats['submitted'] += 1
+        if timeout:
+            GLib.timeout_add(int(timeout * 1000), self._expire, key, token, on_timeout)
+        self._queue.put((key, token, fn, args, on_done))
+        return True
+
+    def every(self, key, seconds, fetch, apply, timeout=None):
+        """Run fetch now and every `seconds`; apply(result) only on change."""
+        def _tick():
+            self.submit(key, fetch, timeout=timeout,
+                        on_done=lambda r: self._apply_changed(key, r, apply))
+            return GLib.SOURCE_CONTINUE
+        _tick()
+        self._timers.append(GLib.timeout_add(int(seconds * 1000), _tick))
+
+    def _apply_changed(self, key, result, apply):
+        if key in self._last and self._last[key] == result:
+            self.stats['unchanged'] += 1
+            return
+        self._last[key] = result
+        self.stats['applied'] += 1
+        apply(result)
+
+    def shutdown(self):
+        if self._closed:
+            return
+        self._closed = True
+        for t in self._timers:
+            GLib.source_remove(t)
+        self._timers = []
+        self._inflight.clear()
+        self._expired.clear()
+        try:
+            while True:
+                self._queue.get_nowait()
+        except queue.Empty:
+            pass
+        for _ in self._workers:
+            self._queue.put(None)
+
+    def _work(self):
+        while True:
+            job = self._queue.get()
+            if job is None:
+                return
+            key, token, fn, args, on_done = job
+            try:
+                result, ok = fn(*args), True
+            except Exception as exc:
+                result, ok = exc, False
+            GLib.idle_add(self._finish, key, token, result, ok, on_done)
+
+    def _finish(self, key, token, result, ok, on_done):
+        if self._inflight.get(key) != token:
+            return False        # shut down meanwhile
+        del self._inflight[key]
+        if token in self._expired:
+            self._expired.discard(token)
+            self.stats['late'] += 1
+            return False
+        if not ok:
+            self.stats['failed'] += 1
+            print(f'[scheduler] {key}: {result!r}', file=sys.stderr)
+        elif on_done:
+            on_done(result)
+        return False
+
+    def _expire(self, key, token, on_timeout):
+        if self._inflight.get(key) == token:
+            self._expired.add(token)
+            self.stats['timed_out'] += 1
+            if on_timeout:
+                on_timeout()
+        return False
+
+
 # ─── Weather ─────────────────────────────────────────────────────────────────
 
 WEATHER_ICONS = {
@@ -174,215 +323,871 @@ WEATHER_ICONS = {
     'Squall': '💨', 'Tornado': '🌪',
 }
 
-_weather_cache = None
-_weather_cache_time = 0.0
-_weather_tomorrow_cache = None
-_weather_tomorrow_cache_time = 0.0
-WEATHER_CACHE_TTL = 600
+WEATHER_CACHE_TTL   = 600
+WEATHER_HOST        = 'api.openweathermap.org'
+WEATHER_STORE_PATH  = os.path.join(CACHE_DIR, 'weather.json')
+WEATHER_STORE_MAX   = 16          # cached (kind, city, lang, units) entries kept on disk
+WEATHER_BACKOFF_MIN = 30
+WEATHER_BACKOFF_MAX = 1800
+
+
+def _parse_current(data, city):
+    main_w = data['weather'][0]['main']
+    return {
+        'icon':     WEATHER_ICONS.get(main_w, '🌡'),
+        'temp':     round(data['main']['temp']),
+        'feels':    round(data['main']['feels_like']),
+        'desc':     data['weather'][0]['description'].capitalize(),
+        'humidity': data['main']['humidity'],
+        'city':     data.get('name', city),
+    }
+
+def _parse_tomorrow(data):
+    tomorrow = (datetime.datetime.now() + datetime.timedelta(days=1)).date()
+    slots = [s for s in data['list']
+             if datetime.datetime.fromtimestamp(s['dt']).date() == tomorrow]
+    if not slots:
+        return None
+    # Pick midday slot or first available
+    midday = None
+    for s in slots:
+        h = datetime.datetime.fromtimestamp(s['dt']).hour
+        if 11 <= h <= 14:
+            midday = s
+            break
+    slot = midday or slots[0]
+    temps = [s['main']['temp'] for s in slots]
+    main_w = slot['weather'][0]['main']
+    return {
+        'icon':     WEATHER_ICONS.get(main_w, '🌡'),
+        'temp':     round(slot['main']['temp']),
+        'temp_min': round(min(temps)),
+        'temp_max': round(max(temps)),
+        'desc':     slot['weather'][0]['description'].capitalize(),
+        'humidity': slot['main']['humidity'],
+    }
+
+
+class WeatherClient:
+    """
+    OpenWeatherMap client.  All requests go over one keep-alive HTTPS
+    connection, results are cached per (city, lang, units), and responses
+    are revalidated with If-None-Match / If-Modified-Since so an unchanged
+    payload costs a 304 instead of a full body.
+
+    With a store_path the cache is persisted, so a new process can render
+    the last known weather immediately (peek) and revalidate afterwards.
+    Results older than the TTL carry 'age_min'.  While the network is down
+    the stale entry is served and retries back off exponentially; a
+    forecast is only served on the day it was fetched, since 'tomorrow'
+    is relative to that day.
+    """
+
+    def __init__(self, host=WEATHER_HOST, https=True, timeout=5,
+                 ttl=WEATHER_CACHE_TTL, store_path=None):
+        self.host = host
+        self.https = https
+        self.timeout = timeout
+        self.ttl = ttl
+        self.store_path = store_path
+        self.stats = {'requests': 0, 'not_modified': 0, 'connects': 0,
+                      'hits': 0, 'stale': 0, 'errors': 0}
+        self._conn = None
+        self._lock = threading.Lock()
+        self._store_lock = threading.Lock()
+        self._cache = {}        # (kind, city, lang, units) -> (epoch, result)
+        self._backoff = {}      # same key -> (retry_at, delay)
+        self._validators = {}   # path -> (etag, last_modified, payload)
+        self._loaded = store_path is None
+
+    def current(self, api_key, city, lang='ru', units='metric'):
+        return self._cached('weather', api_key, city, lang, units)
+
+    def tomorrow(self, api_key, city, lang='ru', units='metric'):
+        return self._cached('forecast', api_key, city, lang, units)
+
+    def peek(self, kind, city, lang='ru', units='metric'):
+        """Last known result for kind ('weather'/'forecast'), however old."""
+        self._load()
+        key = (kind, city, lang, units)
+        now = time.time()
+        hit = self._cache.get(key)
+        return self._aged(hit, now) if hit and self._same_day(key, hit, now) else None
+
+    def fetch_current(self, api_key, city, lang='ru', units='metric'):
+        """Uncached current conditions; raises on failure."""
+        return _parse_current(self._request('weather', api_key, city, lang, units), city)
+
+    def close(self):
+        with self._lock:
+            if self._conn:
+                self._conn.close()
+                self._conn = None
+
+    @staticmethod
+    def _same_day(key, hit, now):
+        return (key[0] != 'forecast' or
+                datetime.date.fromtimestamp(hit[0]) == datetime.date.fromtimestamp(now))
+
+    def _aged(self, hit, now):
+        ts, result = hit
+        if result is None:
+            return None
+        age = now - ts
+        return {**result, 'age_min': int(age // 60) if age >= self.ttl else 0}
+
+    def _cached(self, kind, api_key, city, lang, units):
+        if not api_key or not city:
+            return None
+        self._load()
+        key = (kind, city, lang, units)
+        now = time.time()
+        hit = self._cache.get(key)
+        if hit and not self._same_day(key, hit, now):
+            hit = None
+        if hit and 0 <= now - hit[0] < self.ttl:
+            self.stats['hits'] += 1
+            return self._aged(hit, now)
+        retry_at, delay = self._backoff.get(key, (0, 0))
+        if now < retry_at:
+            self.stats['stale'] += 1
+            return self._aged(hit, now) if hit else None
+        try:
+            data = self._request(kind, api_key, city, lang, units)
+            result = (_parse_current(data, city) if kind == 'weather'
+                      else _parse_tomorrow(data))
+        except Exception:
+            self.stats['errors'] += 1
+            delay = min(max(delay * 2, WEATHER_BACKOFF_MIN), WEATHER_BACKOFF_MAX)
+            self._backoff[key] = (now + delay, delay)
+            return self._aged(hit, now) if hit else None
+        self._backoff.pop(key, None)
+        with self._store_lock:
+            self._cache[key] = (now, result)
+        self._save()
+        return self._aged((now, result), now)
+
+    def _load(self):
+        if self._loaded:
+            return
+        with self._store_lock:
+            if self._loaded:
+                return
+            self._loaded = True
+            try:
+                with open(self.store_path) as f:
+                    for e in json.load(f):
+                        key = (e['kind'], e['city'], e['lang'], e['units'])
+                        self._cache.setdefault(key, (e['t'], e['result']))
+            except Exception:
+                pass
+
+    def _save(self):
+        if not self.store_path:
+            return
+        with self._store_lock:    # also guards _cache against the other worker
+            entries = sorted(self._cache.items(), key=lambda kv: kv[1][0],
+                             reverse=True)[:WEATHER_STORE_MAX]
+            data = [{'kind': k[0], 'city': k[1], 'lang': k[2], 'units': k[3],
+                     't': t, 'result': r} for k, (t, r) in entries]
+            try:
+                os.makedirs(os.path.dirname(self.store_path), exist_ok=True)
+                tmp = f'{self.store_path}.{os.getpid()}.tmp'
+                with open(tmp, 'w') as f:
+                    json.dump(data, f, ensure_ascii=False)
+                os.replace(tmp, self.store_path)
+            except Exception:
+                pass
+
+    def _request(self, kind, api_key, city, lang, units):
+        import urllib.parse
+        query = urllib.parse.urlencode({'q': city, 'appid': api_key,
+                                        'units': units, 'lang': lang})
+        if kind == 'forecast':
+            query += '&cnt=16'
+        path = f'/data/2.5/{kind}?{query}'
+        headers = {'Accept': 'application/json'}
+        etag, modified, payload = self._validators.get(path, (None, None, None))
+        if etag:
+            headers['If-None-Match'] = etag
+        if modified:
+            headers['If-Modified-Since'] = modified
+        with self._lock:
+            status, resp_headers, body = self._send(path, headers)
+        if status == 304 and payload is not None:
+            self.stats['not_modified'] += 1
+            return payload
+        if status != 200:
+            raise OSError(f'HTTP {status}: {body[:200]!r}')
+        data = json.loads(body)
+        if resp_headers.get('ETag') or resp_headers.get('Last-Modified'):
+            self._validators[path] = (resp_headers.get('ETag'),
+                                      resp_headers.get('Last-Modified'), data)
+        return data
+
+    def _send(self, path, headers):
+        import http.client
+        # A kept-alive connection may have been closed by the server between
+        # refreshes; retry once on a fresh one before giving up.
+        for attempt in (0, 1):
+            reused = self._conn is not None
+            if not reused:
+                cls = (http.client.HTTPSConnection if self.https
+                       else http.client.HTTPConnection)
+                self._conn = cls(self.host, timeout=self.timeout)
+                self.stats['connects'] += 1
+            try:
+                self.stats['requests'] += 1
+                self._conn.request('GET', path, headers=headers)
+                r = self._conn.getresponse()
+                body = r.read()
+                if r.will_close:
+                    self._conn.close()
+                    self._conn = None
+                return r.status, r.headers, body
+            except (http.client.HTTPException, OSError):
+                self._conn.close()
+                self._conn = None
+                if not reused or attempt:
+                    raise
+
+
+_weather_client = WeatherClient(store_path=WEATHER_STORE_PATH)
 
 def get_weather(api_key, city, lang='ru'):
-    global _weather_cache, _weather_cache_time
-    now = time.monotonic()
-    if _weather_cache and (now - _weather_cache_time) < WEATHER_CACHE_TTL:
-        return _weather_cache
-    if not api_key or not city:
-        return None
-    try:
-        import urllib.request, urllib.parse
-        city_enc = urllib.parse.quote(city)
-        url = (f'https://api.openweathermap.org/data/2.5/weather'
-               f'?q={city_enc}&appid={api_key}&units=metric&lang={lang}')
-        with urllib.request.urlopen(url, timeout=5) as r:
-            data = json.loads(r.read())
-        main_w = data['weather'][0]['main']
-        result = {
-            'icon':     WEATHER_ICONS.get(main_w, '🌡'),
-            'temp':     round(data['main']['temp']),
-            'feels':    round(data['main']['feels_like']),
-            'desc':     data['weather'][0]['description'].capitalize(),
-            'humidity': data['main']['humidity'],
-            'city':     data.get('name', city),
-        }
-        _weather_cache = result
-        _weather_cache_time = now
-        return result
-    except Exception:
-        return _weather_cache
+    return _weather_client.current(api_key, city, lang=lang)
 
 def get_weather_tomorrow(api_key, city, lang='ru'):
-    """Fetch tomorrow's weather forecast via 5-day/3h forecast API."""
-    global _weather_tomorrow_cache, _weather_tomorrow_cache_time
-    now = time.monotonic()
-    if _weather_tomorrow_cache and (now - _weather_tomorrow_cache_time) < WEATHER_CACHE_TTL:
-        return _weather_tomorrow_cache
-    if not api_key or not city:
-        return None
-    try:
-        import urllib.request, urllib.parse
-        city_enc = urllib.parse.quote(city)
-        url = (f'https://api.openweathermap.org/data/2.5/forecast'
-               f'?q={city_enc}&appid={api_key}&units=metric&lang={lang}&cnt=16')
-        with urllib.request.urlopen(url, timeout=5) as r:
-            data = json.loads(r.read())
-        tomorrow = (datetime.datetime.now() + datetime.timedelta(days=1)).date()
-        slots = [s for s in data['list']
-                 if datetime.datetime.fromtimestamp(s['dt']).date() == tomorrow]
-        if not slots:
+    """Tomorrow's midday forecast from the 5-day/3h forecast API."""
+    return _weather_client.tomorrow(api_key, city, lang=lang)
+
+
+# ─── MPRIS ───────────────────────────────────────────────────────────────────
+
+MPRIS_PREFIX = 'org.mpris.MediaPlayer2.'
+MPRIS_PATH   = '/org/mpris/MediaPlayer2'
+MPRIS_PLAYER = 'org.mpris.MediaPlayer2.Player'
+DBUS_PROPS   = 'org.freedesktop.DBus.Properties'
+
+
+class MprisWatcher:
+    """
+    In-memory model of the session's MPRIS players, kept up to date from
+    NameOwnerChanged, PropertiesChanged and Seeked signals instead of polling.
+    *on_change* runs on the GLib main loop with the active player's info dict
+    (or None) and only when something visible actually changed.
+    """
+
+    def __init__(self, on_change):
+        self._on_change = on_change
+        self._players = {}        # unique bus name -> player state
+        self._last_key = ()
+        self._matches = []
+        try:
+            self._bus = dbus.SessionBus()
+            self._matches.append(self._bus.add_signal_receiver(
+                self._on_owner_changed, 'NameOwnerChanged',
+                'org.freedesktop.DBus', 'org.freedesktop.DBus',
+                '/org/freedesktop/DBus'))
+            self._matches.append(self._bus.add_signal_receiver(
+                self._on_props_changed, 'PropertiesChanged', DBUS_PROPS,
+                None, MPRIS_PATH, sender_keyword='sender'))
+            self._matches.append(self._bus.add_signal_receiver(
+                self._on_seeked, 'Seeked', MPRIS_PLAYER,
+                None, MPRIS_PATH, sender_keyword='sender'))
+            self._dbus_call('org.freedesktop.DBus', '/org/freedesktop/DBus',
+                            'org.freedesktop.DBus', 'ListNames', (),
+                            self._on_names)
+        except Exception:
+            self.close()        # don't leave half the matches installed
+            raise
+
+    def close(self):
+        for m in self._matches:
+            m.remove()
+        self._matches = []
+        self._players.clear()
+
+    def _dbus_call(self, dest, path, iface, method, args, on_reply):
+        self._bus.call_async(dest, path, iface, method, None, args,
+                             on_reply, lambda *_: None)
+
+    def _on_names(self, names):
+        for name in names:
+            if name.startswith(MPRIS_PREFIX):
+                self._dbus_call('org.freedesktop.DBus', '/org/freedesktop/DBus',
+                                'org.freedesktop.DBus', 'GetNameOwner', (name,),
+                                lambda owner, n=name: self._add_player(n, owner))
+
+    def _add_player(self, name, owner):
+        self._players[str(owner)] = {
+            'name': str(name), 'status': 'Stopped', 'meta': {},
+            'position': 0, 'pos_time': time.monotonic(),
+            'seen': time.monotonic(),
+        }
+        self._dbus_call(name, MPRIS_PATH, DBUS_PROPS, 'GetAll', (MPRIS_PLAYER,),
+                        lambda props: self._on_props_changed(
+                            MPRIS_PLAYER, props, [], sender=owner))
+
+    def _resync_position(self, owner, name):
+        self._dbus_call(name, MPRIS_PATH, DBUS_PROPS, 'Get',
+                        (MPRIS_PLAYER, 'Position'),
+                        lambda pos: self._on_seeked(pos, sender=owner))
+
+    def _on_owner_changed(self, name, old, new):
+        if not name.startswith(MPRIS_PREFIX):
+            return
+        if old:
+            self._players.pop(str(old), None)
+        if new:
+            self._add_player(name, new)
+        self._emit()
+
+    def _on_props_changed(self, iface, changed, invalidated, sender=None):
+        p = self._players.get(str(sender))
+        if iface != MPRIS_PLAYER or p is None:
+            return
+        now = time.monotonic()
+        if 'PlaybackStatus' in changed and changed['PlaybackStatus'] != p['status']:
+            p['position'] = self._position(p, now)
+            p['pos_time'] = now
+            p['status'] = str(changed['PlaybackStatus'])
+        if 'Metadata' in changed:
+            meta = changed['Metadata']
+            track_changed = meta.get('mpris:trackid') != p['meta'].get('mpris:trackid')
+            p['meta'] = meta
+            if track_changed:
+                p['position'], p['pos_time'] = 0, now
+                if 'Position' not in changed:
+                    self._resync_position(sender, p['name'])
+        if 'Position' in changed:
+            p['position'], p['pos_time'] = int(changed['Position']), now
+        p['seen'] = now
+        self._emit()
+
+    def _on_seeked(self, position, sender=None):
+        p = self._players.get(str(sender))
+        if p is None:
+            return
+        p['position'], p['pos_time'] = int(position), time.monotonic()
+        self._emit()
+
+    @staticmethod
+    def _position(p, now):
+        if p['status'] != 'Playing':
+            return p['position']
+        return p['position'] + int((now - p['pos_time']) * 1_000_000)
+
+    def _active(self):
+        if not self._players:
             return None
-        # Pick midday slot or first available
-        midday = None
-        for s in slots:
-            h = datetime.datetime.fromtimestamp(s['dt']).hour
-            if 11 <= h <= 14:
-                midday = s
-                break
-        slot = midday or slots[0]
-        temps = [s['main']['temp'] for s in slots]
-        main_w = slot['weather'][0]['main']
-        result = {
-            'icon':     WEATHER_ICONS.get(main_w, '🌡'),
-            'temp':     round(slot['main']['temp']),
-            'temp_min': round(min(temps)),
-            'temp_max': round(max(temps)),
-            'desc':     slot['weather'][0]['description'].capitalize(),
-            'humidity': slot['main']['humidity'],
+        return max(self._players.values(),
+                   key=lambda p: (p['status'] == 'Playing', p['seen']))
+
+    def _emit(self):
+        p = self._active()
+        key = p and (p['name'], p['status'], p['position'], p['pos_time'],
+                     tuple(sorted((str(k), str(v)) for k, v in p['meta'].items())))
+        if key == self._last_key:
+            return
+        self._last_key = key
+        self._on_change(self.info())
+
+    def info(self):
+        """Active player as a dict, or None when no player is running."""
+        p = self._active()
+        if p is None:
+            return None
+        meta    = p['meta']
+        artists = meta.get('xesam:artist', ['—'])
+        length  = int(meta.get('mpris:length', 0))
+        position = self._position(p, time.monotonic())
+        return {
+            'title':    str(meta.get('xesam:title', '—')),
+            'artist':   str(artists[0]) if artists else '—',
+            'status':   p['status'],
+            'album':    str(meta.get('xesam:album', '')),
+            'art_url':  str(meta.get('mpris:artUrl', '')),
+            'length':   length,
+            'position': min(position, length) if length else position,
         }
-        _weather_tomorrow_cache = result
-        _weather_tomorrow_cache_time = now
-        return result
-    except Exception:
-        return _weather_tomorrow_cache
 
 
-def get_spotify_info():
-    try:
-        bus = dbus.SessionBus()
-        for name in bus.list_names():
-            if 'mpris' in name.lower():
-                try:
-                    obj   = bus.get_object(name, '/org/mpris/MediaPlayer2')
-                    props = dbus.Interface(obj, 'org.freedesktop.DBus.Properties')
-                    meta  = props.Get('org.mpris.MediaPlayer2.Player', 'Metadata')
-                    status  = str(props.Get('org.mpris.MediaPlayer2.Player', 'PlaybackStatus'))
-                    title   = str(meta.get('xesam:title', '—'))
-                    artists = meta.get('xesam:artist', ['—'])
-                    artist  = str(artists[0]) if artists else '—'
-                    album   = str(meta.get('xesam:album', ''))
-                    art_url = str(meta.get('mpris:artUrl', ''))
-                    length  = int(meta.get('mpris:length', 0))
-                    try:
-                        position = int(props.Get('org.mpris.MediaPlayer2.Player', 'Position'))
-                    except Exception:
-                        position = 0
-                    return {
-                        'title': title, 'artist': artist, 'status': status,
-                        'album': album, 'art_url': art_url,
-                        'length': length, 'position': position,
-                    }
-                except Exception:
-                    continue
-    except Exception:
-        pass
-    return None
+# ─── Display power ───────────────────────────────────────────────────────────
 
+MUTTER_DISPLAY      = 'org.gnome.Mutter.DisplayConfig'
+MUTTER_DISPLAY_PATH = '/org/gnome/Mutter/DisplayConfig'
 
-def fetch_album_art(url):
-    if not url:
-        return None
+
+class DisplayPowerWatcher:
+    """
+    Calls on_change(blanked) on the main loop when the monitors are put to
+    sleep (DPMS) or woken, from Mutter's DisplayConfig.PowerSaveMode.  On
+    compositors without that interface it simply never fires.
+    """
+
+    def __init__(self, on_change):
+        self._on_change = on_change
+        self.blanked = False
+        self._match = None
+        try:
+            bus = dbus.SessionBus()
+            self._match = bus.add_signal_receiver(
+                self._on_props_changed, 'PropertiesChanged', DBUS_PROPS,
+                MUTTER_DISPLAY, MUTTER_DISPLAY_PATH)
+            bus.call_async(MUTTER_DISPLAY, MUTTER_DISPLAY_PATH, DBUS_PROPS, 'Get',
+                           None, (MUTTER_DISPLAY, 'PowerSaveMode'),
+                           self._set_mode, lambda *_: None)
+        except Exception:
+            pass
+
+    def close(self):
+        if self._match:
+            self._match.remove()
+            self._match = None
+
+    def _on_props_changed(self, iface, changed, invalidated):
+        if iface == MUTTER_DISPLAY and 'PowerSaveMode' in changed:
+            self._set_mode(changed['PowerSaveMode'])
+
+    def _set_mode(self, mode):
+        blanked = int(mode) != 0       # 0 on, 1 standby, 2 suspend, 3 off
+        if blanked != self.blanked:
+            self.blanked = blanked
+            self._on_change(blanked)
+
+
+# ─── Album art ───────────────────────────────────────────────────────────────
+
+ART_SIZE            = 64
+ART_MEM_ENTRIES     = 32
+ART_CACHE_DIR       = os.path.join(CACHE_DIR, 'art')
+ART_CACHE_MAX_BYTES = 16 * 1024**2
+
+
+def _decode_pixbuf(data, size):
+    """Decode image bytes in memory, fitted inside size×size."""
+    from gi.repository import GdkPixbuf
+    loader = GdkPixbuf.PixbufLoader()
+    def _fit(ldr, w, h):
+        scale = min(size / w, size / h)
+        ldr.set_size(max(1, round(w * scale)), max(1, round(h * scale)))
+    loader.connect('size-prepared', _fit)
     try:
+        loader.write(data)
+    finally:
+        loader.close()
+    return loader.get_pixbuf()
+
+
+class AlbumArtCache:
+    """
+    Album art keyed by mpris:artUrl: an in-memory LRU of decoded pixbufs in
+    front of a bounded on-disk store of the already-scaled pixels.
+    Concurrent requests for the same URL share a single download.
+    """
+
+    def __init__(self, size=ART_SIZE, mem_entries=ART_MEM_ENTRIES,
+                 disk_dir=ART_CACHE_DIR, disk_max_bytes=ART_CACHE_MAX_BYTES):
+        self.size = size
+        self.mem_entries = mem_entries
+        self.disk_dir = disk_dir
+        self.disk_max_bytes = disk_max_bytes
+        self.stats = {'mem_hits': 0, 'disk_hits': 0, 'misses': 0,
+                      'coalesced': 0, 'errors': 0}
+        self._mem = collections.OrderedDict()
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    def get(self, url):
+        """Blocking lookup; call from a worker thread."""
+        if not url:
+            return None
+        with self._lock:
+            pb = self._mem.get(url)
+            if pb is not None:
+                self._mem.move_to_end(url)
+                self.stats['mem_hits'] += 1
+                return pb
+            done = self._inflight.get(url)
+            owner = done is None
+            if owner:
+                done = self._inflight[url] = threading.Event()
+            else:
+                self.stats['coalesced'] += 1
+        if not owner:
+            done.wait(timeout=10)
+            with self._lock:
+                return self._mem.get(url)
+
+        pb = None
+        try:
+            pb = self._load(url)
+        except Exception:
+            self._count('errors')
+        finally:
+            with self._lock:
+                if pb is not None:
+                    self._mem[url] = pb
+                    while len(self._mem) > self.mem_entries:
+                        self._mem.popitem(last=False)
+                del self._inflight[url]
+            done.set()
+        return pb
+
+    def _count(self, stat):
+        # Loads run on several workers; += on a shared dict is not atomic.
+        with self._lock:
+            self.stats[stat] += 1
+
+    def _load(self, url):
         from gi.repository import GdkPixbuf
-        import urllib.request, tempfile
         if url.startswith('file://'):
-            path = url[7:]
-            return GdkPixbuf.Pixbuf.new_from_file_at_size(path, 64, 64)
+            return GdkPixbuf.Pixbuf.new_from_file_at_size(
+                url[7:], self.size, self.size)
+        cpath = os.path.join(self.disk_dir,
+                             hashlib.sha1(url.encode()).hexdigest() + '.rgb')
+        raw = _read_raw_pixels(cpath)
+        if raw:
+            w, h, nc, rs, data = raw
+            self._count('disk_hits')
+            return GdkPixbuf.Pixbuf.new_from_bytes(
+                data, GdkPixbuf.Colorspace.RGB, nc == 4, 8, w, h, rs)
+        self._count('misses')
+        import urllib.request
         with urllib.request.urlopen(url, timeout=3) as resp:
-            data = resp.read()
-        tmp = tempfile.NamedTemporaryFile(delete=False, suffix='.jpg')
-        tmp.write(data); tmp.close()
-        pix = GdkPixbuf.Pixbuf.new_from_file_at_size(tmp.name, 64, 64)
-        os.unlink(tmp.name)
-        return pix
-    except Exception:
-        return None
+            pb = _decode_pixbuf(resp.read(), self.size)
+        try:
+            os.makedirs(self.disk_dir, exist_ok=True)
+            _write_raw_pixbuf(cpath, pb)
+            _evict_lru(self.disk_dir, self.disk_max_bytes)
+        except OSError:
+            pass
+        return pb
+
+
+_art_cache = AlbumArtCache()
+
+def fetch_album_art(url):
+    return _art_cache.get(url)
 
 
-def get_dominant_color(pixbuf):
+# ─── Accent colours ──────────────────────────────────────────────────────────
+
+ACCENT_DEFAULT   = (29, 185, 84)
+PALETTE_ENTRIES  = 64
+_palette_cache = collections.OrderedDict()
+_palette_lock  = threading.Lock()
+
+
+def _palette_np(pixbuf):
+    nc = pixbuf.get_n_channels()
+    w, h, rs = pixbuf.get_width(), pixbuf.get_height(), pixbuf.get_rowstride()
+    buf = np.zeros(h * rs, dtype=np.uint8)
+    px = pixbuf.get_pixels()
+    buf[:len(px)] = np.frombuffer(px, dtype=np.uint8)
+    rgb = buf.reshape(h, rs)[:, :w*nc].reshape(-1, nc)[:, :3].astype(np.int32)
+    mx, mn = rgb.max(axis=1), rgb.min(axis=1)
+    keep = (mx >= 30) & (mx - mn >= 20)
+    if not keep.any():
+        return None
+    rgb, mx, mn = rgb[keep], mx[keep], mn[keep]
+    order = np.argsort(mx - mn, kind='stable')   # by chroma
+    n = max(1, len(order) // 5)
+    mean = lambda a: tuple(int(v) for v in a.mean(axis=0))
+    return {'dominant': mean(rgb), 'vibrant': mean(rgb[order[-n:]]),
+            'muted': mean(rgb[order[:n]])}
+
+
+def _palette_py(pixbuf):
+    # Let GdkPixbuf's C scaler do the averaging, then look at ≤256 pixels
+    from gi.repository import GdkPixbuf
+    small = pixbuf.scale_simple(16, 16, GdkPixbuf.InterpType.TILES)
+    nc, rs, px = small.get_n_channels(), small.get_rowstride(), small.get_pixels()
+    rgb = [tuple(px[y*rs + x*nc:y*rs + x*nc + 3]) for y in range(16) for x in range(16)]
+    rgb = [c for c in rgb if max(c) >= 30 and max(c) - min(c) >= 20]
+    if not rgb:
+        return None
+    order = sorted(rgb, key=lambda c: max(c) - min(c))   # by chroma
+    n = max(1, len(order) // 5)
+    mean = lambda cs: tuple(sum(c[i] for c in cs) // len(cs) for i in range(3))
+    return {'dominant': mean(rgb), 'vibrant': mean(order[-n:]),
+            'muted': mean(order[:n])}
+
+
+def get_palette(pixbuf):
+    """
+    Dominant, vibrant and muted colours of *pixbuf*, memoized by the hash of
+    its pixels so a repeated cover costs one sha1 of 12 KB.
+    """
+    default = {'dominant': ACCENT_DEFAULT, 'vibrant': ACCENT_DEFAULT,
+               'muted': ACCENT_DEFAULT}
+    if pixbuf is None:
+        return default
     try:
-        pixels = pixbuf.get_pixels()
-        nc = pixbuf.get_n_channels()
-        w, h = pixbuf.get_width(), pixbuf.get_height()
-        step = max(1, (w * h) // 200)
-        r_s = g_s = b_s = cnt = 0
-        for i in range(0, w * h, step):
-            off = i * nc
-            r, g, b = pixels[off], pixels[off+1], pixels[off+2]
-            if max(r, g, b) < 30: continue
-            if max(r, g, b) - min(r, g, b) < 20: continue
-            r_s += r; g_s += g; b_s += b; cnt += 1
-        if cnt == 0:
-            return (29, 185, 84)
-        return (r_s//cnt, g_s//cnt, b_s//cnt)
+        key = hashlib.sha1(pixbuf.get_pixels()).digest()
+        with _palette_lock:
+            pal = _palette_cache.get(key)
+            if pal is not None:
+                _palette_cache.move_to_end(key)
+                return pal
+        pal = (_palette_np(pixbuf) if np is not None else _palette_py(pixbuf)) or default
+        with _palette_lock:
+            _palette_cache[key] = pal
+            while len(_palette_cache) > PALETTE_ENTRIES:
+                _palette_cache.popitem(last=False)
+        return pal
     except Exception:
-        return (29, 185, 84)
+        return default
 
 
-def get_sysmon():
-    try:
-        import psutil
-        cpu   = psutil.cpu_percent(interval=0.25)
-        mem   = psutil.virtual_memory()
-        disk  = psutil.disk_usage('/')
-        net_1 = psutil.net_io_counters()
-        time.sleep(0.5)
-        net_2 = psutil.net_io_counters()
-        net_rx = (net_2.bytes_recv - net_1.bytes_recv) / 0.5
-        net_tx = (net_2.bytes_sent - net_1.bytes_sent) / 0.5
-        procs = []
-        for p in psutil.process_iter(['pid', 'name', 'cpu_percent', 'memory_percent']):
+# ─── System monitor ──────────────────────────────────────────────────────────
+
+SYSMON_TOP_N   = 3
+SYSMON_PID_FDS = 32     # /proc/<pid>/stat files kept open (the busiest PIDs)
+
+
+class SysmonSampler:
+    """
+    Persistent system sampler.  Every figure is a delta against the
+    previous sample() call, so a tick never sleeps; psutil.Process objects
+    are kept across ticks so their cpu_percent() is meaningful.
+    """
+
+    def __init__(self, top_n=SYSMON_TOP_N):
+        self.top_n = top_n
+        try:
+            import psutil
+        except ImportError:
+            psutil = None
+        self._psutil = psutil
+        self._procs = {}
+        self._net = None
+        self._net_time = 0.0
+        self._fallback = None
+        if not psutil:
+            self._fallback = ProcSysmonSampler(top_n)
+        else:
+            psutil.cpu_percent(interval=None)
+            self._net = psutil.net_io_counters()
+            self._net_time = time.monotonic()
+            self._scan_procs()
+
+    def close(self):
+        if self._fallback:
+            self._fallback.close()
+
+    def _scan_procs(self):
+        psutil = self._psutil
+        pids = set(psutil.pids())
+        for pid in self._procs.keys() - pids:
+            del self._procs[pid]
+        for pid in pids - self._procs.keys():
             try:
-                procs.append(p.info)
-            except Exception:
+                p = psutil.Process(pid)
+                p.cpu_percent(None)   # prime; the first reading is always 0
+                self._procs[pid] = p
+            except psutil.Error:
                 pass
-        top = sorted(procs, key=lambda p: p.get('cpu_percent', 0), reverse=True)[:3]
-        return {
-            'cpu':        cpu,
-            'mem_used':   mem.used   / 1024**3,
-            'mem_total':  mem.total  / 1024**3,
-            'mem_pct':    mem.percent,
-            'disk_used':  disk.used  / 1024**3,
-            'disk_total': disk.total / 1024**3,
-            'disk_pct':   disk.percent,
-            'net_rx':     net_rx,
-            'net_tx':     net_tx,
-            'top_procs':  top,
-        }
-    except ImportError:
+
+    def _top_procs(self):
+        psutil = self._psutil
+        usage = []
+        for pid, p in list(self._procs.items()):
+            try:
+                usage.append((p.cpu_percent(None), pid))
+            except psutil.Error:
+                del self._procs[pid]
+        top = []
+        for cpu, pid in heapq.nlargest(self.top_n, usage):
+            p = self._procs[pid]
+            try:
+                top.append({'pid': pid, 'name': p.name(), 'cpu_percent': cpu,
+                            'memory_percent': p.memory_percent()})
+            except psutil.Error:
+                pass
+        return top
+
+    def sample(self):
+        if self._fallback:
+            return self._fallback.sample()
+        try:
+            psutil = self._psutil
+            cpu  = psutil.cpu_percent(interval=None)
+            mem  = psutil.virtual_memory()
+            disk = psutil.disk_usage('/')
+            net  = psutil.net_io_counters()
+            now  = time.monotonic()
+            dt   = max(now - self._net_time, 1e-3)
+            net_rx = (net.bytes_recv - self._net.bytes_recv) / dt
+            net_tx = (net.bytes_sent - self._net.bytes_sent) / dt
+            self._net, self._net_time = net, now
+            self._scan_procs()
+            return {
+                'cpu':        cpu,
+                'mem_used':   mem.used   / 1024**3,
+                'mem_total':  mem.total  / 1024**3,
+                'mem_pct':    mem.percent,
+                'disk_used':  disk.used  / 1024**3,
+                'disk_total': disk.total / 1024**3,
+                'disk_pct':   disk.percent,
+                'net_rx':     net_rx,
+                'net_tx':     net_tx,
+                'top_procs':  self._top_procs(),
+            }
+        except Exception:
+            return None
+
+
+class ProcSysmonSampler:
+    """
+    Dependency-free SysmonSampler backend reading /proc directly.  The
+    system files and the stat files of the SYSMON_PID_FDS busiest PIDs
+    stay open and are re-read from offset 0 each tick; other PIDs are
+    opened per tick.  Every figure is a delta against the previous tick,
+    so nothing sleeps.
+    """
+
+    def __init__(self, top_n=SYSMON_TOP_N):
+        self.top_n = top_n
+        self._clk_tck = os.sysconf('SC_CLK_TCK')
+        self._page = os.sysconf('SC_PAGE_SIZE')
+        self._stat = os.open('/proc/stat', os.O_RDONLY)
+        self._meminfo = os.open('/proc/meminfo', os.O_RDONLY)
+        self._netdev = os.open('/proc/net/dev', os.O_RDONLY)
+        self._pid_fds = {}     # pid -> fd of /proc/<pid>/stat, busiest PIDs only
+        self._pid_ticks = {}   # pid -> utime+stime at the previous tick
+        self._cpu = self._cpu_times()
+        self._net = self._net_bytes()
+        self._time = time.monotonic()
+        self._proc_ticks()
+
+    @staticmethod
+    def _reread(fd, size=65536):
+        os.lseek(fd, 0, os.SEEK_SET)
+        chunks = []
+        while True:
+            chunk = os.read(fd, size)
+            if not chunk:
+                return b''.join(chunks)
+            chunks.append(chunk)
+
+    def close(self):
+        for fd in (self._stat, self._meminfo, self._netdev, *self._pid_fds.values()):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+        self._pid_fds.clear()
+
+    def _cpu_times(self):
+        v = list(map(int, self._reread(self._stat, 4096).split(b'\n', 1)[0].split()[1:]))
+        return v[3] + v[4], sum(v[:8])    # idle + iowait, total without guest
+
+    def _net_bytes(self):
+        rx = tx = 0
+        for line in self._reread(self._netdev).splitlines()[2:]:
+            f = line.split(b':', 1)[1].split()
+            rx += int(f[0])
+            tx += int(f[8])
+        return rx, tx
+
+    def _read_pid_stat(self, pid):
+        fd = self._pid_fds.get(pid)
+        if fd is not None:
+            return self._reread(fd, 1024)
+        with open(f'/proc/{pid}/stat', 'rb') as f:
+            return f.read()
+
+    def _keep_open(self, pids):
+        """Hold stat fds for exactly `pids`, closing the rest."""
+        for pid in self._pid_fds.keys() - pids:
+            os.close(self._pid_fds.pop(pid))
+        for pid in pids - self._pid_fds.keys():
+            try:
+                self._pid_fds[pid] = os.open(f'/proc/{pid}/stat', os.O_RDONLY)
+            except OSError:
+                pass
+
+    def _forget_pid(self, pid):
+        self._pid_ticks.pop(pid, None)
+        fd = self._pid_fds.pop(pid, None)
+        if fd is not None:
+            os.close(fd)
+
+    def _proc_ticks(self):
+        """utime+stime delta, comm and rss pages of every process."""
+        pids = {int(e.name) for e in os.scandir('/proc') if e.name.isdigit()}
+        for pid in self._pid_ticks.keys() - pids:
+            self._forget_pid(pid)
+        out = []
+        for pid in pids:
+            try:
+                data = self._read_pid_stat(pid)
+            except OSError:
+                self._forget_pid(pid)
+                continue
+            head, _, rest = data.rpartition(b')')
+            f = rest.split()
+            ticks = int(f[11]) + int(f[12])
+            prev = self._pid_ticks.get(pid)
+            self._pid_ticks[pid] = ticks
+            if prev is not None:
+                out.append((ticks - prev, pid, head.split(b'(', 1)[1], int(f[21])))
+        self._keep_open({pid for _, pid, _, _ in heapq.nlargest(SYSMON_PID_FDS, out)})
+        return out
+
+    def sample(self):
         try:
-            def _cpu_stat():
-                with open('/proc/stat') as f:
-                    v = list(map(int, f.readline().split()[1:]))
-                return v[3], sum(v)
-            i1, t1 = _cpu_stat(); time.sleep(0.25); i2, t2 = _cpu_stat()
-            cpu = 100.0 * (1.0 - (i2-i1) / max(t2-t1, 1))
+            now = time.monotonic()
+            dt = max(now - self._time, 1e-3)
+            self._time = now
+
+            idle, total = self._cpu_times()
+            d_idle, d_total = idle - self._cpu[0], total - self._cpu[1]
+            self._cpu = idle, total
+            cpu = 100.0 * (1.0 - d_idle / d_total) if d_total > 0 else 0.0
+
             mem = {}
-            with open('/proc/meminfo') as f:
-                for line in f:
-                    p = line.split()
-                    mem[p[0].rstrip(':')] = int(p[1])
-            total = mem.get('MemTotal', 1)
-            avail = mem.get('MemAvailable', total)
+            for line in self._reread(self._meminfo).splitlines():
+                p = line.split()
+                mem[p[0].rstrip(b':')] = int(p[1])
+            total_kb = mem.get(b'MemTotal', 1)
+            avail_kb = mem.get(b'MemAvailable', total_kb)
+
+            st = os.statvfs('/')
+            disk_total = st.f_blocks * st.f_frsize
+            disk_used = (st.f_blocks - st.f_bfree) * st.f_frsize
+            disk_avail = st.f_bavail * st.f_frsize
+
+            rx, tx = self._net_bytes()
+            net_rx, net_tx = (rx - self._net[0]) / dt, (tx - self._net[1]) / dt
+            self._net = rx, tx
+
+            top = []
+            for d_ticks, pid, comm, rss in heapq.nlargest(
+                    self.top_n, self._proc_ticks()):
+                top.append({
+                    'pid': pid,
+                    'name': comm.decode(errors='replace'),
+                    'cpu_percent': 100.0 * d_ticks / self._clk_tck / dt,
+                    'memory_percent': 100.0 * rss * self._page / (total_kb * 1024),
+                })
+
             return {
-                'cpu': cpu,
-                'mem_used':   (total-avail)/1024**2,
-                'mem_total':  total/1024**2,
-                'mem_pct':    100*(total-avail)/total,
-                'disk_used': None, 'disk_total': None, 'disk_pct': None,
-                'net_rx': None, 'net_tx': None, 'top_procs': [],
+                'cpu':        cpu,
+                'mem_used':   (total_kb - avail_kb) / 1024**2,
+                'mem_total':  total_kb / 1024**2,
+                'mem_pct':    100 * (total_kb - avail_kb) / total_kb,
+                'disk_used':  disk_used / 1024**3,
+                'disk_total': disk_total / 1024**3,
+                'disk_pct':   100 * disk_used / max(disk_used + disk_avail, 1),
+                'net_rx':     net_rx,
+                'net_tx':     net_tx,
+                'top_procs':  top,
             }
         except Exception:
             return None
-    except Exception:
-        return None
 
 
 def _fmt_bytes(b):
@@ -392,7 +1197,140 @@ def _fmt_bytes(b):
     return f'{b/1024**2:.1f} MB/s'
 
 
-_notifications = []
+NOTIF_ROWS      = 3       # rows shown on the card
+NOTIF_GROUPS    = 32      # per-app groups kept in memory
+NOTIF_LOG_PATH  = os.path.join(CACHE_DIR, 'notifications.log')
+NOTIF_LOG_KEEP  = 500     # records kept when the log is compacted
+NOTIF_MAX_AGE   = 86400   # history older than this is not shown again
+NOTIF_FLUSH_MS  = 1000
+
+
+def _open_private(path, flags):
+    """open() for files only the user may read (notification text, 2FA codes)."""
+    fd = os.open(path, flags, 0o600)
+    try:
+        os.fchmod(fd, 0o600)    # logs written before this was private
+        return os.fdopen(fd, 'a' if flags & os.O_APPEND else 'w')
+    except Exception:
+        os.close(fd)
+        raise
+
+
+class NotificationStore:
+    """
+    Notifications grouped by app, newest group last, with a count per
+    group over at most NOTIF_MAX_AGE; older groups are dropped and a
+    count restarts once its run is older than that.  History is appended
+    as JSON lines to a user-only (0600) log that is
+    compacted to the last NOTIF_LOG_KEEP records once it doubles.  Writes
+    are batched every NOTIF_FLUSH_MS and coalesced per sender, so a flood
+    from one app costs one dict update per Notify and one log line per
+    flush.  Main-loop only.
+    """
+
+    def __init__(self, path=NOTIF_LOG_PATH):
+        self.path = path
+        self.stats = {'received': 0, 'written': 0, 'compactions': 0}
+        self._groups = collections.OrderedDict()   # app -> record
+        self._recent = collections.deque(maxlen=NOTIF_LOG_KEEP)
+        self._pending = collections.OrderedDict()  # app -> record not yet on disk
+        self._lines = 0
+        self._flush_id = 0
+        self._loaded = False
+
+    def add(self, app, summary, body):
+        self._load()
+        self.stats['received'] += 1
+        now = time.time()
+        self._expire(now)
+        g = self._groups.pop(app, None)
+        if g and now - g['since'] <= NOTIF_MAX_AGE:
+            count, since = g['count'] + 1, g['since']
+        else:
+            count, since = 1, now
+        self._groups[app] = {'app': app, 'summary': summary, 'body': body,
+                             'ts': now, 'count': count, 'since': since}
+        while len(self._groups) > NOTIF_GROUPS:
+            self._groups.popitem(last=False)
+        p = self._pending.get(app)
+        self._pending[app] = {'app': app, 'summary': summary, 'body': body,
+                              'ts': now, 'count': p['count'] + 1 if p else 1}
+        if not self._flush_id:
+            self._flush_id = GLib.timeout_add(NOTIF_FLUSH_MS, self.flush)
+
+    def groups(self, n):
+        """Up to n most recently active groups, newest first."""
+        self._load()
+        self._expire(time.time())
+        out = []
+        for g in reversed(self._groups.values()):
+            if len(out) == n:
+                break
+            out.append(g)
+        return out
+
+    def flush(self):
+        if self._flush_id:
+            GLib.source_remove(self._flush_id)
+            self._flush_id = 0
+        if not self._pending:
+            return False
+        records = list(self._pending.values())
+        self._pending.clear()
+        self._recent.extend(records)
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            if self._lines + len(records) > 2 * NOTIF_LOG_KEEP:
+                tmp = f'{self.path}.{os.getpid()}.tmp'
+                with _open_private(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC) as f:
+                    for r in self._recent:
+                        f.write(json.dumps(r, ensure_ascii=False) + '\n')
+                os.replace(tmp, self.path)
+                self._lines = len(self._recent)
+                self.stats['compactions'] += 1
+            else:
+                with _open_private(self.path, os.O_WRONLY | os.O_CREAT | os.O_APPEND) as f:
+                    for r in records:
+                        f.write(json.dumps(r, ensure_ascii=False) + '\n')
+                self._lines += len(records)
+            self.stats['written'] += len(records)
+        except Exception:
+            pass
+        return False
+
+    def _expire(self, now):
+        # Groups are ordered by last activity, so stale ones sit at the front.
+        cutoff = now - NOTIF_MAX_AGE
+        while self._groups and next(iter(self._groups.values()))['ts'] < cutoff:
+            self._groups.popitem(last=False)
+
+    def _load(self):
+        if self._loaded:
+            return
+        self._loaded = True
+        try:
+            with open(self.path) as f:
+                for line in f:
+                    self._lines += 1
+                    try:
+                        self._recent.append(json.loads(line))
+                    except ValueError:
+                        pass
+        except OSError:
+            return
+        cutoff = time.time() - NOTIF_MAX_AGE
+        for r in self._recent:
+            if r.get('ts', 0) < cutoff:
+                continue
+            g = self._groups.pop(r['app'], None)
+            self._groups[r['app']] = {**r, 'count': r.get('count', 1) +
+                                      (g['count'] if g else 0),
+                                      'since': g['since'] if g else r['ts']}
+        while len(self._groups) > NOTIF_GROUPS:
+            self._groups.popitem(last=False)
+
+
+_notif_store = NotificationStore()
 
 def start_notif_spy(on_notify_cb):
     try:
@@ -415,64 +1353,619 @@ def start_notif_spy(on_notify_cb):
         pass
 
 
+PROC_WATCH_FULL_SECS = 30   # re-read every comm at most this often while absent
+
+class ProcessWatcher:
+    """
+    In-process `pgrep -x`: finds a process by /proc/<pid>/comm and caches
+    its PID.  While that PID is alive with the same comm, pid() costs one
+    small read; it rescans only after the process goes away.  While nothing
+    matches, only PIDs not seen before are checked, with a full re-read
+    every PROC_WATCH_FULL_SECS to catch processes that exec'd into a name.
+    """
+
+    def __init__(self, names, proc_root='/proc'):
+        self.names = {n[:15] for n in names}   # the kernel truncates comm to 15
+        self.proc_root = proc_root
+        self.stats = {'scans': 0, 'checks': 0}
+        self._lock = threading.Lock()
+        self._pid = None
+        self._seen = set()      # PIDs already known not to match
+        self._full_at = 0.0
+
+    def _comm(self, pid):
+        try:
+            with open(f'{self.proc_root}/{pid}/comm', 'rb') as f:
+                return f.read().rstrip(b'\n').decode('utf-8', 'replace')
+        except OSError:
+            return None
+
+    def pid(self):
+        with self._lock:
+            if self._pid is not None:
+                self.stats['checks'] += 1
+                if self._comm(self._pid) in self.names:
+                    return self._pid
+                self._pid = None
+            return self._scan()
+
+    def running(self):
+        return self.pid() is not None
+
+    def _scan(self):
+        now = time.monotonic()
+        if now - self._full_at > PROC_WATCH_FULL_SECS:
+            self._seen.clear()
+            self._full_at = now
+        self.stats['scans'] += 1
+        alive = set()
+        try:
+            with os.scandir(self.proc_root) as it:
+                for e in it:
+                    if not e.name.isdigit():
+                        continue
+                    pid = int(e.name)
+                    alive.add(pid)
+                    if pid in self._seen:
+                        continue
+                    if self._comm(pid) in self.names:
+                        self._pid = pid
+                        return pid
+                    self._seen.add(pid)
+        except OSError:
+            return None
+        self._seen &= alive
+        return None
+
+
+_vscodium_watcher = ProcessWatcher(('codium', 'code', 'code-oss'))
+
 def is_vscodium_running():
-    try:
-        r = subprocess.run(['pgrep', '-x', 'codium'], capture_output=True)
-        return r.returncode == 0
-    except Exception:
-        return False
+    return _vscodium_watcher.running()
+
+VSCODE_STORAGE_PATHS = [
+    os.path.expanduser(f'~/.config/{d}/User/globalStorage/storage.json')
+    for d in ('VSCodium', 'Code', 'Code - OSS')
+]
+
+def _read_opened_paths(path):
+    """openedPathsList from storage.json, decoding only that value."""
+    with open(path, 'rb') as f:
+        raw = f.read()
+    i = raw.find(b'"openedPathsList"')
+    if i >= 0:
+        j = raw.find(b':', i) + 1
+        text = raw[j:].decode('utf-8', 'replace')
+        try:
+            value, _ = json.JSONDecoder().raw_decode(text.lstrip())
+            if isinstance(value, dict):
+                return value
+        except ValueError:
+            pass
+    return json.loads(raw).get('openedPathsList', {})
+
+
+class WorkspaceHistory:
+    """
+    Most recent workspace folder from the VSCodium / VS Code / Code-OSS
+    storage.json.  The parsed history is cached per file on (mtime, size),
+    and the resolved project is kept until the file changes or the folder
+    disappears, so a refresh normally costs one stat() per location.
+    """
+
+    def __init__(self, paths=VSCODE_STORAGE_PATHS):
+        self.paths = paths
+        self._cache = {}    # storage path -> (mtime_ns, size, folder list)
+        self._lock = threading.Lock()
+
+    def _folders(self, path, st):
+        hit = self._cache.get(path)
+        if hit and hit[0] == st.st_mtime_ns and hit[1] == st.st_size:
+            return hit[2]
+        import urllib.parse
+        folders = []
+        try:
+            opened = _read_opened_paths(path)
+            entries = opened.get('workspaces3') or opened.get('entries') or []
+            for e in entries:
+                uri = e if isinstance(e, str) else e.get('folderUri', '')
+                if uri.startswith('file://'):
+                    folders.append(urllib.parse.unquote(uri[7:]))
+        except Exception:
+            pass
+        self._cache[path] = (st.st_mtime_ns, st.st_size, folders)
+        return folders
 
-def get_vscodium_recent_project():
-    storage = os.path.expanduser(
-        '~/.config/VSCodium/User/globalStorage/storage.json')
-    if not os.path.exists(storage):
+    def recent_project(self):
+        with self._lock:
+            found = []
+            for path in self.paths:
+                try:
+                    found.append((os.stat(path), path))
+                except OSError:
+                    self._cache.pop(path, None)
+            # The storage file written last belongs to the editor used last.
+            for st, path in sorted(found, key=lambda f: f[0].st_mtime_ns, reverse=True):
+                for folder in self._folders(path, st):
+                    if os.path.isdir(folder):
+                        return folder
         return None
-    try:
-        with open(storage) as f:
-            data = json.load(f)
-        entries = (data.get('openedPathsList', {}).get('workspaces3') or
-                   data.get('openedPathsList', {}).get('entries') or [])
-        for e in entries:
-            uri = e if isinstance(e, str) else e.get('folderUri', '')
-            if uri.startswith('file://'):
-                path = uri[7:]
-                if os.path.isdir(path):
-                    return path
-    except Exception:
-        pass
-    return None
+
+
+_workspace_history = WorkspaceHistory()
+
+def get_vscodium_recent_project():
+    return _workspace_history.recent_project()
 
 CODE_EXT = {'js','ts','py','rs','go','c','cpp','h','java','rb','php','cs',
             'swift','kt','jsx','tsx','vue','svelte','html','css','scss',
             'json','yaml','yml','toml','md','sh','lua'}
 
+# ─── Project index ───────────────────────────────────────────────────────────
+
+PROJECT_SKIP_DIRS     = {'node_modules', '__pycache__'}   # plus every dot-dir
+PROJECT_RESCAN_SECS   = 60      # rescan throttle when inotify is unavailable
+_IN_CLOSE_WRITE = 0x008
+_IN_MOVED_FROM  = 0x040
+_IN_MOVED_TO    = 0x080
+_IN_CREATE      = 0x100
+_IN_DELETE      = 0x200
+_IN_DELETE_SELF = 0x400
+_IN_Q_OVERFLOW  = 0x4000
+_IN_IGNORED     = 0x8000
+_IN_ISDIR       = 0x40000000
+_IN_WATCH_MASK  = (_IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO |
+                   _IN_CREATE | _IN_DELETE | _IN_DELETE_SELF)
+_IN_EVENT       = struct.Struct('iIII')
+
+
+def _is_code_file(name):
+    if name.startswith('.') or '.' not in name:
+        return False
+    return name.rsplit('.', 1)[-1].lower() in CODE_EXT
+
+
+def _gitignore_rules(dirpath):
+    """Compile <dirpath>/.gitignore into [(regex, negate, dir_only)]."""
+    import re
+    rules = []
+    try:
+        with open(os.path.join(dirpath, '.gitignore'), errors='replace') as f:
+            lines = f.read().splitlines()
+    except OSError:
+        return rules
+    for line in lines:
+        line = line.rstrip()
+        if not line or line.startswith('#'):
+            continue
+        negate = line.startswith('!')
+        if negate:
+            line = line[1:]
+        dir_only = line.endswith('/')
+        line = line.rstrip('/')
+        # A slash anywhere but the end anchors the pattern to this directory.
+        anchored = '/' in line
+        line = line.lstrip('/')
+        rx, i = '', 0
+        while i < len(line):
+            if line.startswith('**/', i):
+                rx += '(?:.*/)?'
+                i += 3
+            elif line.startswith('**', i):
+                rx += '.*'
+                i += 2
+            elif line[i] == '*':
+                rx += '[^/]*'
+                i += 1
+            elif line[i] == '?':
+                rx += '[^/]'
+                i += 1
+            else:
+                rx += re.escape(line[i])
+                i += 1
+        rx = ('^' if anchored else '^(?:.*/)?') + rx + '$'
+        rules.append((re.compile(rx), negate, dir_only))
+    return rules
+
+
+def _gitignored(ignores, path, is_dir):
+    """ignores: [(base_dir, rules)] from the root down; last match wins."""
+    ignored = False
+    for base, rules in ignores:
+        rel = os.path.relpath(path, base)
+        for rx, negate, dir_only in rules:
+            if (is_dir or not dir_only) and rx.match(rel):
+                ignored = not negate
+    return ignored
+
+
+class ProjectIndex:
+    """
+    Code files of a project tree with their mtimes.  The tree is walked
+    once with os.scandir (honouring .gitignore, skipping dot-dirs and
+    node_modules) and then kept current from inotify events, which are
+    drained whenever the index is queried.  latest() reads the top of a
+    max-heap keyed by mtime, popping entries invalidated since.  If
+    inotify is unavailable or runs out of watches the index falls back
+    to a full rescan at most every PROJECT_RESCAN_SECS.
+    """
+
+    def __init__(self, root):
+        self.root = os.path.abspath(root)
+        self.stats = {'scans': 0, 'events': 0, 'watches': 0, 'polling': False}
+        self._lock = threading.Lock()
+        self._mtimes = {}       # path -> mtime
+        self._heap = []         # (-mtime, path); stale entries skipped lazily
+        self._ignores = {}      # dir -> [(base_dir, rules)] in effect inside it
+        self._wds = {}          # watch descriptor -> dir
+        self._fd = -1
+        self._libc = None
+        self._scanned_at = 0.0
+        self._inotify_init()
+        self._rescan()
+
+    def latest(self):
+        """Most recently modified code file, or None."""
+        with self._lock:
+            if self._fd >= 0:
+                self._drain()
+            elif time.monotonic() - self._scanned_at > PROJECT_RESCAN_SECS:
+                self._rescan()
+            heap, mtimes = self._heap, self._mtimes
+            while heap and mtimes.get(heap[0][1]) != -heap[0][0]:
+                heapq.heappop(heap)
+            return heap[0][1] if heap else None
+
+    def close(self):
+        with self._lock:
+            if self._fd >= 0:
+                os.close(self._fd)
+                self._fd = -1
+            self._wds.clear()
+
+    # inotify ----------------------------------------------------------------
+
+    def _inotify_init(self):
+        try:
+            import ctypes
+            libc = ctypes.CDLL(None, use_errno=True)
+            fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+            if fd < 0:
+                raise OSError(ctypes.get_errno(), 'inotify_init1')
+            self._libc, self._fd = libc, fd
+        except Exception:
+            self._fd = -1
+            self.stats['polling'] = True
+
+    def _watch(self, path):
+        if self._fd < 0:
+            return
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(path), _IN_WATCH_MASK)
+        if wd < 0:
+            # Out of watches (ENOSPC) or similar: stop relying on events.
+            self._stop_watching()
+            return
+        self._wds[wd] = path
+        self.stats['watches'] = len(self._wds)
+
+    def _stop_watching(self):
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+        self._wds.clear()
+        self.stats['polling'] = True
+
+    def _drain(self):
+        rescan = False
+        while self._fd >= 0:
+            try:
+                buf = os.read(self._fd, 65536)
+            except BlockingIOError:
+                break
+            except OSError:
+                self._stop_watching()
+                break
+            off = 0
+            while off < len(buf):
+                wd, mask, _cookie, nlen = _IN_EVENT.unpack_from(buf, off)
+                off += _IN_EVENT.size
+                name = os.fsdecode(buf[off:off + nlen].rstrip(b'\0'))
+                off += nlen
+                self.stats['events'] += 1
+                if mask & _IN_Q_OVERFLOW or name == '.gitignore':
+                    rescan = True
+                    continue
+                if mask & (_IN_IGNORED | _IN_DELETE_SELF):
+                    self._wds.pop(wd, None)
+                    continue
+                parent = self._wds.get(wd)
+                if parent is None or not name:
+                    continue
+                path = os.path.join(parent, name)
+                if mask & _IN_ISDIR:
+                    if mask & (_IN_DELETE | _IN_MOVED_FROM):
+                        self._forget_dir(path)
+                    elif mask & (_IN_CREATE | _IN_MOVED_TO) and not self._skip_dir(
+                            name, path, self._ignores.get(parent, [])):
+                        self._scan(path, self._ignores.get(parent, []))
+                elif mask & (_IN_DELETE | _IN_MOVED_FROM):
+                    self._mtimes.pop(path, None)
+                elif mask & (_IN_CLOSE_WRITE | _IN_MOVED_TO):
+                    if _is_code_file(name) and not _gitignored(
+                            self._ignores.get(parent, []), path, False):
+                        try:
+                            self._add(path, os.stat(path).st_mtime)
+                        except OSError:
+                            pass
+        if rescan:
+            self._rescan()
+
+    # scanning ---------------------------------------------------------------
+
+    def _add(self, path, mtime):
+        self._mtimes[path] = mtime
+        heapq.heappush(self._heap, (-mtime, path))
+        if len(self._heap) > 2 * len(self._mtimes) + 64:
+            self._heap = [(-m, p) for p, m in self._mtimes.items()]
+            heapq.heapify(self._heap)
+
+    def _forget_dir(self, path):
+        prefix = path + os.sep
+        for p in [p for p in self._mtimes if p.startswith(prefix)]:
+            del self._mtimes[p]
+        for d in [d for d in self._ignores if d == path or d.startswith(prefix)]:
+            del self._ignores[d]
+
+    def _rescan(self):
+        self._mtimes.clear()
+        self._ignores.clear()
+        self._heap = []
+        self._scan(self.root, [])
+        self._scanned_at = time.monotonic()
+        self.stats['scans'] += 1
+
+    @staticmethod
+    def _skip_dir(name, path, ignores):
+        return (name.startswith('.') or name in PROJECT_SKIP_DIRS
+                or _gitignored(ignores, path, True))
+
+    def _scan(self, top, ignores):
+        stack = [(top, ignores)]
+        while stack:
+            d, ign = stack.pop()
+            rules = _gitignore_rules(d)
+            if rules:
+                ign = ign + [(d, rules)]
+            self._ignores[d] = ign
+            self._watch(d)
+            try:
+                it = os.scandir(d)
+            except OSError:
+                continue
+            with it:
+                for e in it:
+                    try:
+                        if e.is_dir(follow_symlinks=False):
+                            if not self._skip_dir(e.name, e.path, ign):
+                                stack.append((e.path, ign))
+                        elif _is_code_file(e.name) and e.is_file():
+                            if not _gitignored(ign, e.path, False):
+                                self._add(e.path, e.stat().st_mtime)
+                    except OSError:
+                        pass
+
+
+_project_index = None
+
 def get_last_modified_file(directory):
+    global _project_index
     try:
-        latest, latest_time = None, 0
-        for fname in os.listdir(directory):
-            if fname.startswith('.'): continue
-            ext = fname.rsplit('.', 1)[-1].lower() if '.' in fname else ''
-            if ext not in CODE_EXT: continue
-            fpath = os.path.join(directory, fname)
-            if not os.path.isfile(fpath): continue
-            mtime = os.path.getmtime(fpath)
-            if mtime > latest_time:
-                latest_time, latest = mtime, fpath
-        return latest
+        if _project_index is None or _project_index.root != os.path.abspath(directory):
+            if _project_index:
+                _project_index.close()
+            _project_index = ProjectIndex(directory)
+        return _project_index.latest()
     except Exception:
         return None
 
+SNIPPET_BLOCK = 16 * 1024
+SNIPPET_MAX_SCAN = 64 * 1024   # bytes read back from EOF at most (minified files)
+SNIPPET_SNIFF = 8192        # leading bytes checked for NULs (binary files)
+_snippet_cache = collections.OrderedDict()   # (path, lines) -> (mtime_ns, size, text)
+_SNIPPET_CACHE_MAX = 8
+
+def _tail_lines(f, size, lines):
+    """
+    Last `lines` lines before any trailing blank ones, reading back from EOF.
+    At most SNIPPET_MAX_SCAN bytes are read; a line cut by that limit is
+    shown from its tail, prefixed with '…'.
+    """
+    pos, blocks, newlines, content = size, [], 0, False
+    while pos > 0 and size - pos < SNIPPET_MAX_SCAN:
+        step = min(SNIPPET_BLOCK, pos, SNIPPET_MAX_SCAN - (size - pos))
+        pos -= step
+        f.seek(pos)
+        block = f.read(step)
+        blocks.append(block)
+        if content:
+            newlines += block.count(b'\n')
+        elif block.strip():             # first block past the trailing whitespace
+            content = True
+            newlines += block.rstrip().count(b'\n')
+        # One more newline than wanted means the first needed line is complete.
+        if newlines >= lines:
+            break
+    data = b''.join(reversed(blocks))
+    text = data.decode('utf-8', 'replace').replace('\r\n', '\n').replace('\r', '\n')
+    all_lines = text.splitlines(keepends=True)
+    if pos > 0 and all_lines:
+        if newlines >= lines:
+            all_lines = all_lines[1:]   # partial line at the block boundary
+        else:
+            all_lines[0] = '…' + all_lines[0]
+    while all_lines and all_lines[-1].strip() == '':
+        all_lines.pop()
+    return ''.join(all_lines[-lines:])
+
 def read_file_snippet(path, lines=18):
+    """
+    Last `lines` non-trailing-blank lines of a text file ('' for binaries).
+    Reads backwards from EOF, and an unchanged file costs a single stat().
+    """
     try:
-        with open(path, errors='replace') as f:
-            all_lines = f.readlines()
-        while all_lines and all_lines[-1].strip() == '':
-            all_lines.pop()
-        return ''.join(all_lines[-lines:])
+        st = os.stat(path)
+        key = (path, lines)
+        hit = _snippet_cache.get(key)
+        if hit and hit[0] == st.st_mtime_ns and hit[1] == st.st_size:
+            _snippet_cache.move_to_end(key)
+            return hit[2]
+        with open(path, 'rb') as f:
+            text = ('' if b'\0' in f.read(SNIPPET_SNIFF)
+                    else _tail_lines(f, st.st_size, lines))
+        _snippet_cache[key] = (st.st_mtime_ns, st.st_size, text)
+        _snippet_cache.move_to_end(key)
+        while len(_snippet_cache) > _SNIPPET_CACHE_MAX:
+            _snippet_cache.popitem(last=False)
+        return text
     except Exception:
         return ''
 
 
+# ─── Syntax highlighting ─────────────────────────────────────────────────────
+
+# TextTag name -> properties; created on the VSCodium card's buffer.
+HIGHLIGHT_TAGS = {
+    'kw':      {'foreground': '#C792EA'},
+    'string':  {'foreground': '#C3E88D'},
+    'comment': {'foreground': '#6A7A8C', 'style': Pango.Style.ITALIC},
+    'number':  {'foreground': '#F78C6C'},
+    'func':    {'foreground': '#82AAFF'},
+}
+
+_KW_C    = ('break case char const continue default do double else enum extern '
+            'float for goto if inline int long return short signed sizeof static '
+            'struct switch typedef union unsigned void volatile while NULL true false bool')
+_KW_JS   = ('async await break case catch class const continue default delete do '
+            'else export extends false finally for from function if import in '
+            'instanceof let new null of return static super switch this throw '
+            'true try typeof undefined var void while yield')
+_HL_LANGS = {
+    # ext: (comment style, keywords)
+    'py':   ('#',  'and as assert async await break class continue def del elif else '
+                   'except False finally for from global if import in is lambda None '
+                   'nonlocal not or pass raise return self True try while with yield'),
+    'js':   ('//', _KW_JS),
+    'ts':   ('//', _KW_JS + ' interface type enum implements private public '
+                   'protected readonly declare namespace as keyof'),
+    'rs':   ('//', 'as async await break const continue crate else enum extern false '
+                   'fn for if impl in let loop match mod move mut pub ref return self '
+                   'Self static struct super trait true type unsafe use where while'),
+    'go':   ('//', 'break case chan const continue default defer else fallthrough for '
+                   'func go goto if import interface map package range return select '
+                   'struct switch type var nil true false'),
+    'c':    ('//', _KW_C),
+    'cpp':  ('//', _KW_C + ' class namespace template typename public private '
+                   'protected virtual override new delete this nullptr using try '
+                   'catch throw auto'),
+    'java': ('//', 'abstract boolean break byte case catch char class continue default '
+                   'do double else enum extends final finally float for if implements '
+                   'import instanceof int interface long new null package private '
+                   'protected public return short static super switch this throw '
+                   'throws true false try void while var'),
+    'cs':   ('//', 'abstract as async await base bool break case catch class const '
+                   'continue default do else enum false finally for foreach if in int '
+                   'interface internal is namespace new null out override private '
+                   'protected public readonly ref return static string struct switch '
+                   'this throw true try using var virtual void while'),
+    'kt':   ('//', 'as break class continue data do else false for fun if import in '
+                   'interface is null object override package private return sealed '
+                   'super this throw true try val var when while'),
+    'swift':('//', 'as break case class continue default defer else enum extension '
+                   'false for func guard if import in init let nil protocol return '
+                   'self static struct switch throw true try var while'),
+    'php':  ('//', 'array as break case catch class const continue default do echo '
+                   'else elseif extends false finally fn for foreach function if '
+                   'implements interface namespace new null private protected public '
+                   'return static switch this throw true try use while'),
+    'rb':   ('#',  'alias and begin break case class def defined do else elsif end '
+                   'ensure false for if in module next nil not or redo rescue retry '
+                   'return self super then true undef unless until when while yield'),
+    'sh':   ('#',  'case do done elif else esac export fi for function if in local '
+                   'return then until while'),
+    'lua':  ('--', 'and break do else elseif end false for function goto if in local '
+                   'nil not or repeat return then true until while'),
+    'css':  ('/*', ''),
+    'json': ('',   'true false null'),
+    'yaml': ('#',  'true false null yes no'),
+    'toml': ('#',  'true false'),
+    'html': ('<!--', ''),
+    'md':   ('',   ''),
+}
+for _alias, _lang in (('jsx', 'js'), ('tsx', 'ts'), ('vue', 'html'), ('svelte', 'html'),
+                      ('scss', 'css'), ('h', 'c'), ('yml', 'yaml')):
+    _HL_LANGS[_alias] = _HL_LANGS[_lang]
+
+_HL_COMMENTS = {
+    '#':    r'#[^\n]*',
+    '//':   r'//[^\n]*|/\*.*?(?:\*/|$)',
+    '/*':   r'/\*.*?(?:\*/|$)',
+    '--':   r'--[^\n]*',
+    '<!--': r'<!--.*?(?:-->|$)',
+    '':     None,
+}
+_hl_regex_cache = {}
+_hl_cache = collections.OrderedDict()    # (ext, text) -> spans
+_HL_CACHE_MAX = 16
+
+
+def _hl_regex(ext):
+    import re
+    rx = _hl_regex_cache.get(ext)
+    if rx is None:
+        comment, keywords = _HL_LANGS[ext]
+        parts = []
+        if _HL_COMMENTS[comment]:
+            parts.append(f'(?P<comment>{_HL_COMMENTS[comment]})')
+        parts.append(r'(?P<string>"(?:\\.|[^"\\\n])*"?|\'(?:\\.|[^\'\\\n])*\'?'
+                     + (r'|`[^`]*`?' if ext in ('js', 'ts', 'jsx', 'tsx', 'go', 'md') else '') + ')')
+        parts.append(r'(?P<number>\b(?:0[xX][0-9a-fA-F_]+|\d[\d_]*(?:\.\d+)?(?:[eE][+-]?\d+)?)\b)')
+        if keywords:
+            parts.append(r'(?P<kw>\b(?:' + '|'.join(map(re.escape, keywords.split())) + r')\b)')
+        parts.append(r'(?P<func>\b[A-Za-z_]\w*(?=\s*\())')
+        rx = _hl_regex_cache[ext] = re.compile('|'.join(parts), re.DOTALL)
+    return rx
+
+
+def highlight_code(text, ext):
+    """
+    Tokenize a snippet into ((start, end, tag), ...) character spans for
+    HIGHLIGHT_TAGS.  Regex-based and line-local apart from block comments,
+    which is plenty for the card; results are memoized per (ext, text).
+    """
+    ext = ext.lower()
+    if not text or ext not in _HL_LANGS:
+        return ()
+    key = (ext, text)
+    spans = _hl_cache.get(key)
+    if spans is None:
+        if ext == 'md':
+            import re
+            spans = tuple((m.start(), m.end(), 'kw' if m.group(1) else 'string')
+                          for m in re.finditer(r'^(#{1,6} .*)$|`[^`\n]+`', text, re.M))
+        else:
+            spans = tuple((m.start(), m.end(), m.lastgroup)
+                          for m in _hl_regex(ext).finditer(text))
+        _hl_cache[key] = spans
+        while len(_hl_cache) > _HL_CACHE_MAX:
+            _hl_cache.popitem(last=False)
+    else:
+        _hl_cache.move_to_end(key)
+    return spans
+
+
+AUTH_TIMEOUT_MS = 10000
+
+
 def unlock_session(password):
     try:
         r = subprocess.run(
@@ -492,48 +1985,880 @@ def unlock_session(password):
         return True
 
 
-def blur_pixbuf(pixbuf, radius=14):
+# ─── Animated media ──────────────────────────────────────────────────────────
+
+GIF_MAX_W        = 400
+GIF_FRAME_BUDGET = 48 * 1024 * 1024   # bytes of pre-scaled frames kept in memory
+GIF_MIN_DELAY    = 20                 # ms; browsers clamp 0/1-tick delays too
+
+
+def _gif_frame_count(path):
+    """Count a GIF's image descriptors by walking its blocks, without decoding."""
+    with open(path, 'rb') as f:
+        data = f.read()
+    if data[:3] != b'GIF' or len(data) < 13:
+        return 0
+    pos, frames = 13, 0
+    if data[10] & 0x80:
+        pos += 3 << ((data[10] & 7) + 1)     # global colour table
+    while pos < len(data):
+        block = data[pos]
+        if block == 0x21:                    # extension: introducer + label
+            pos += 2
+        elif block == 0x2C:                  # image descriptor
+            frames += 1
+            flags = data[pos + 9] if pos + 9 < len(data) else 0
+            pos += 10
+            if flags & 0x80:
+                pos += 3 << ((flags & 7) + 1)
+            pos += 1                         # LZW minimum code size
+        else:                                # 0x3B trailer or garbage
+            break
+        while pos < len(data):               # data sub-blocks
+            size = data[pos]
+            pos += 1 + size
+            if not size:
+                break
+    return frames
+
+
+class GifPlayer:
+    """
+    Plays a GIF into a Gtk.Picture.  decode() (safe on a worker thread)
+    scales every frame once to fit GIF_MAX_W; attach() turns them into a
+    ring of textures that the picture's frame clock steps through, so a
+    frame costs one set_paintable and nothing is rescaled or re-uploaded.
+    GIFs whose scaled frames would exceed GIF_FRAME_BUDGET are decoded on
+    demand instead.  Playback only ticks while the picture is mapped and
+    resumes where it left off.
+    """
+
+    def __init__(self, path, max_w=GIF_MAX_W, budget=GIF_FRAME_BUDGET):
+        self.path = path
+        self.max_w = max_w
+        self.budget = budget
+        self.size = (0, 0)
+        self.stats = {'mode': None, 'frames': 0, 'bytes': 0, 'shown': 0}
+        self._frames = []       # pre-scaled pixbufs, then textures
+        self._ends = []         # cumulative end time of each frame, ms
+        self._iter = None       # on-demand fallback
+        self._picture = None
+        self._tick_id = 0
+        self._handlers = []
+        self._index = -1
+        self._t0 = 0            # frame-clock µs corresponding to t=0
+        self._paused_at = None
+        self._due = 0
+
+    def decode(self):
+        from gi.repository import GdkPixbuf
+        anim = GdkPixbuf.PixbufAnimation.new_from_file(self.path)
+        w0, h0 = anim.get_width(), anim.get_height()
+        w = min(w0, self.max_w)
+        h = max(1, int(h0 * (w / w0)))
+        self.size = (w, h)
+        if anim.is_static_image():
+            self._add(anim.get_static_image().scale_simple(
+                w, h, GdkPixbuf.InterpType.BILINEAR), 0)
+            self.stats['mode'] = 'static'
+            return self
+        n = _gif_frame_count(self.path) if self.path.lower().endswith('.gif') else 0
+        if n and n * w * h * 4 <= self.budget:
+            try:
+                tv = GLib.TimeVal()
+                it = anim.get_iter(tv)
+                t = 0
+                for _ in range(n):
+                    raw = it.get_delay_time()
+                    self._add(it.get_pixbuf().scale_simple(
+                        w, h, GdkPixbuf.InterpType.BILINEAR), raw)
+                    t += max(raw, 1)
+                    tv.tv_sec, tv.tv_usec = divmod(t * 1000, 1_000_000)
+                    it.advance(tv)
+                self.stats['mode'] = 'ring'
+                return self
+            except Exception:
+                self._frames, self._ends = [], []
+        self._iter = anim.get_iter(None)
+        self.stats['mode'] = 'on-demand'
+        return self
+
+    def _add(self, pixbuf, delay):
+        delay = max(delay, GIF_MIN_DELAY) if delay >= 0 else 0
+        self._frames.append(pixbuf)
+        self._ends.append((self._ends[-1] if self._ends else 0) + delay)
+        self.stats['frames'] = len(self._frames)
+        self.stats['bytes'] += pixbuf.get_rowstride() * pixbuf.get_height()
+
+    def attach(self, picture):
+        """Show the animation in picture (main thread)."""
+        self._picture = picture
+        self._frames = [Gdk.Texture.new_for_pixbuf(pb) for pb in self._frames]
+        w, h = self.size
+        picture.set_size_request(w, h)
+        self._index = -1
+        self._show(0)
+        if self._iter or len(self._frames) > 1:
+            self._handlers = [picture.connect('map', self._on_map),
+                              picture.connect('unmap', self._on_unmap)]
+            if picture.get_mapped():
+                self._on_map(picture)
+
+    def detach(self):
+        if self._picture:
+            self._on_unmap(self._picture)
+            for h in self._handlers:
+                self._picture.disconnect(h)
+            self._handlers = []
+            self._picture = None
+        self._frames, self._iter = [], None
+
+    def _show(self, index):
+        if index != self._index and self._frames:
+            self._index = index
+            self._picture.set_paintable(self._frames[index])
+            self.stats['shown'] += 1
+
+    @staticmethod
+    def _now(picture):
+        # Frame-clock time when there is one, so _t0/_due match _on_tick.
+        clock = picture.get_frame_clock()
+        return clock.get_frame_time() if clock else GLib.get_monotonic_time()
+
+    def _on_map(self, picture):
+        if self._tick_id:
+            return
+        now = self._now(picture)
+        if self._paused_at is None:
+            self._t0 = now
+            if self._iter:
+                # Show the first frame now and time the next one from here.
+                self._next_on_demand(advance=False)
+                self._due = now + max(self._iter.get_delay_time(), GIF_MIN_DELAY) * 1000
+        else:
+            self._t0 += now - self._paused_at
+            self._due += now - self._paused_at
+        self._paused_at = None
+        self._tick_id = picture.add_tick_callback(self._on_tick)
+
+    def _on_unmap(self, picture):
+        if self._tick_id:
+            picture.remove_tick_callback(self._tick_id)
+            self._tick_id = 0
+            self._paused_at = self._now(picture)
+
+    def _on_tick(self, picture, clock):
+        now = clock.get_frame_time()
+        if self._iter:
+            if now >= self._due:
+                self._next_on_demand()
+                self._due = now + max(self._iter.get_delay_time(), GIF_MIN_DELAY) * 1000
+            return GLib.SOURCE_CONTINUE
+        total = self._ends[-1]
+        if total > 0:
+            t = (now - self._t0) // 1000 % total
+            import bisect
+            self._show(bisect.bisect_right(self._ends, t))
+        return GLib.SOURCE_CONTINUE
+
+    def _next_on_demand(self, advance=True):
+        from gi.repository import GdkPixbuf
+        if advance:
+            self._iter.advance(None)
+        w, h = self.size
+        self._picture.set_paintable(Gdk.Texture.new_for_pixbuf(
+            self._iter.get_pixbuf().scale_simple(w, h, GdkPixbuf.InterpType.NEAREST)))
+        self.stats['shown'] += 1
+
+
+# ─── Video pipelines ─────────────────────────────────────────────────────────
+
+VIDEO_VA_DECODERS = ('vah264dec', 'vah265dec', 'vavp8dec', 'vavp9dec', 'vaav1dec',
+                     'vampeg2dec', 'vaapih264dec', 'vaapih265dec', 'vaapivp8dec',
+                     'vaapivp9dec', 'vaapiav1dec', 'vaapimpeg2dec')
+MEDIA_VIDEO_MAX   = (720, 540)   # media card decode cap (HiDPI headroom over 220×165)
+_PLAY_FLAG_AUDIO  = 0x2          # GstPlayFlags.AUDIO
+_va_decoders      = None
+
+
+def _prefer_va_decoders(Gst):
+    """
+    Rank installed VA-API decoders above the software ones, once per
+    process.  decodebin still picks a software decoder for codecs the GPU
+    can't handle; an explicit GST_PLUGIN_FEATURE_RANK is left alone.
+    """
+    global _va_decoders
+    if _va_decoders is None:
+        _va_decoders = [n for n in VIDEO_VA_DECODERS if Gst.ElementFactory.find(n)]
+        if not os.environ.get('GST_PLUGIN_FEATURE_RANK'):
+            for name in _va_decoders:
+                Gst.ElementFactory.find(name).set_rank(Gst.Rank.PRIMARY + 1)
+    return _va_decoders
+
+
+def _scale_filter(Gst, max_size, hw):
+    """playbin video-filter that scales frames down to at most max_size."""
+    w, h = max_size
+    scaler = 'vapostproc' if hw and Gst.ElementFactory.find('vapostproc') else 'videoscale'
+    caps = f'video/x-raw(ANY),width=[1,{int(w)}],height=[1,{int(h)}]'
+    return Gst.parse_bin_from_description(f'{scaler} ! capsfilter caps="{caps}"', True)
+
+
+class VideoPipeline:
+    """
+    A looping playbin drawn into a Gtk.Picture (gtk4paintablesink, else
+    gtksink's widget).  Frames are capped to max_size right after decode
+    and the loop uses segment seeks, so it wraps around without flushing.
+    Audio isn't decoded at all when volume is 0.  Prerolls to PAUSED;
+    play()/pause()/close() drive it from there.
+    """
+
+    def __init__(self, name, path, fit, max_size, volume=0.0):
+        gi.require_version('Gst', '1.0')
+        from gi.repository import Gst
+        Gst.init(None)
+        self._Gst = Gst
+        self.loops = 0
+        self._segment = False
+        hw = _prefer_va_decoders(Gst)
+
+        pipeline = Gst.ElementFactory.make('playbin', name)
+        if not pipeline:
+            raise RuntimeError('GStreamer playbin not available')
+        sink = (Gst.ElementFactory.make('gtk4paintablesink', f'{name}-sink') or
+                Gst.ElementFactory.make('gtksink', f'{name}-sink'))
+        if not sink:
+            raise RuntimeError('No GTK GStreamer video sink found. '
+                               'Install gstreamer1.0-gtk4 or gstreamer1.0-plugins-good')
+        pipeline.set_property('video-sink', sink)
+        pipeline.set_property('volume', volume)
+        if volume <= 0:
+            pipeline.set_property('flags', int(pipeline.get_property('flags')) & ~_PLAY_FLAG_AUDIO)
+        try:
+            pipeline.set_property('video-filter', _scale_filter(Gst, max_size, hw))
+        except Exception as e:
+            print(f'[{name}] no decode size cap: {e}', file=sys.stderr)
+        pipeline.set_property('uri', Gio.File.new_for_path(path).get_uri())
+
+        self._bus = pipeline.get_bus()
+        self._bus.add_signal_watch()
+        self._bus_id = self._bus.connect('message', self._on_message)
+
+        try:
+            widget = Gtk.Picture()
+            widget.set_paintable(sink.get_property('paintable'))
+            widget.set_content_fit(fit)
+        except Exception:
+            widget = sink.get_property('widget')
+
+        self.name = name
+        self.pipeline = pipeline
+        self.sink = sink
+        self.widget = widget
+        pipeline.set_state(Gst.State.PAUSED)   # preroll: first frame shows even while paused
+
+    def play(self):
+        if self.pipeline:
+            self.pipeline.set_state(self._Gst.State.PLAYING)
+
+    def pause(self):
+        if self.pipeline:
+            self.pipeline.set_state(self._Gst.State.PAUSED)
+
+    def close(self):
+        if not self.pipeline:
+            return
+        self.pipeline.set_state(self._Gst.State.NULL)
+        self._bus.disconnect(self._bus_id)
+        self._bus.remove_signal_watch()
+        self.pipeline = self.sink = self._bus = None
+
+    def _seek_start(self, flush):
+        Gst = self._Gst
+        flags = Gst.SeekFlags.SEGMENT
+        if flush:
+            flags |= Gst.SeekFlags.FLUSH
+        return self.pipeline.seek(1.0, Gst.Format.TIME, flags,
+                                  Gst.SeekType.SET, 0, Gst.SeekType.NONE, -1)
+
+    def _on_message(self, bus, msg):
+        Gst = self._Gst
+        t = msg.type
+        if t == Gst.MessageType.ASYNC_DONE and not self._segment:
+            # First preroll: switch to a segment so the end posts
+            # SEGMENT_DONE instead of EOS.
+            self._segment = True
+            self._seek_start(flush=True)
+        elif t == Gst.MessageType.SEGMENT_DONE:
+            self.loops += 1
+            self._seek_start(flush=False)
+        elif t == Gst.MessageType.EOS:
+            # Demuxers without segment seeking still end in EOS.
+            self.loops += 1
+            self._seek_start(flush=True)
+        elif t == Gst.MessageType.ERROR:
+            err, dbg = msg.parse_error()
+            print(f'[{self.name}] GStreamer error: {err} / {dbg}', file=sys.stderr)
+
+
+class MediaPipelines:
+    """
+    Owns every video pipeline of a lock screen window (live wallpaper,
+    media card).  set_playing() follows the window's visibility;
+    shutdown() takes all of them to NULL and releases the decoders.
+    """
+
+    def __init__(self):
+        self._pipes = {}
+        self._playing = False
+
+    def open(self, name, path, fit, max_size, volume=0.0):
+        """Replace pipeline `name` with one playing `path`; returns its widget."""
+        self.close(name)
+        pipe = VideoPipeline(name, path, fit, max_size, volume)
+        self._pipes[name] = pipe
+        if self._playing:
+            pipe.play()
+        return pipe.widget
+
+    def set_playing(self, on):
+        if on == self._playing:
+            return
+        self._playing = on
+        for pipe in self._pipes.values():
+            if on:
+                pipe.play()
+            else:
+                pipe.pause()
+
+    def close(self, name):
+        pipe = self._pipes.pop(name, None)
+        if pipe:
+            pipe.close()
+
+    def shutdown(self):
+        for name in list(self._pipes):
+            self.close(name)
+        self._playing = False
+
+    @property
+    def stats(self):
+        return {'va_decoders': _va_decoders or [],
+                **{name: {'loops': p.loops} for name, p in self._pipes.items()}}
+
+
+# ─── Frosted blur ────────────────────────────────────────────────────────────
+
+BLUR_PASSES = 3
+# Per-pass radius above which the blur runs on a downscaled copy
+BLUR_DOWNSCALE_RADIUS = 8
+
+
+def _box_blur_line(line, r):
+    """Running-sum box blur of one channel (clamped edges, floor average)."""
+    last = len(line) - 1
+    d = 2 * r + 1
+    s = 0
+    for i in range(-r, r + 1):
+        s += line[min(max(i, 0), last)]
+    out = bytearray(len(line))
+    for x in range(last + 1):
+        out[x] = s // d
+        s += line[min(x + r + 1, last)] - line[max(x - r, 0)]
+    return out
+
+
+def _box_blur_py(px, w, h, nc, rs, r, passes):
+    px = bytearray(px)
+    for _ in range(passes):
+        for y in range(h):
+            for c in range(nc):
+                row = slice(y*rs + c, y*rs + w*nc, nc)
+                px[row] = _box_blur_line(px[row], r)
+        for x in range(w):
+            for c in range(nc):
+                col = slice(x*nc + c, (h-1)*rs + x*nc + c + 1, rs)
+                px[col] = _box_blur_line(px[col], r)
+    return bytes(px)
+
+
+def _box_blur_np(px, w, h, nc, rs, r, passes):
+    buf = np.zeros(h * rs, dtype=np.uint8)
+    buf[:len(px)] = np.frombuffer(px, dtype=np.uint8)
+    rows = buf.reshape(h, rs)
+    img = rows[:, :w*nc].reshape(h, w, nc).astype(np.int32)
+    d = 2 * r + 1
+    for _ in range(passes):
+        for axis in (1, 0):
+            a = np.moveaxis(img, axis, 0)
+            # One extra leading edge sample so that c[x+d] - c[x] is the window
+            a = np.concatenate((np.repeat(a[:1], r + 1, axis=0), a,
+                                np.repeat(a[-1:], r, axis=0)))
+            c = np.cumsum(a, axis=0, dtype=np.int32)
+            img = np.moveaxis((c[d:] - c[:-d]) // d, 0, axis)
+    rows[:, :w*nc] = img.reshape(h, w * nc)
+    return buf[:len(px)].tobytes()
+
+
+def _box_blur(px, w, h, nc, rs, r, passes=BLUR_PASSES, use_numpy=True):
+    """Separable box blur of raw pixbuf bytes, O(1) per pixel in the radius."""
+    if np is not None and use_numpy:
+        return _box_blur_np(px, w, h, nc, rs, r, passes)
+    return _box_blur_py(px, w, h, nc, rs, r, passes)
+
+
+def blur_pixbuf(pixbuf, radius=14, downscale=True):
+    """
+    Frosted-glass blur: three horizontal+vertical box passes ≈ gaussian.
+    Large radii are blurred on a downscaled copy and scaled back up,
+    which looks the same and costs a fraction of the time.
+    """
     try:
         from gi.repository import GdkPixbuf
-        w = pixbuf.get_width()
-        h = pixbuf.get_height()
-        nc = pixbuf.get_n_channels()
-        rs = pixbuf.get_rowstride()
-        px = bytearray(pixbuf.get_pixels())
-
-        def box_blur_pass(src, dst, w, h, nc, rs, r):
-            for y in range(h):
-                for x in range(w):
-                    rs_v = rb_v = rg_v = ra_v = 0
-                    cnt = 0
-                    for dx in range(-r, r+1):
-                        nx = max(0, min(w-1, x+dx))
-                        off = y*rs + nx*nc
-                        rs_v += src[off]
-                        rg_v += src[off+1]
-                        rb_v += src[off+2]
-                        if nc == 4: ra_v += src[off+3]
-                        cnt += 1
-                    off = y*rs + x*nc
-                    dst[off]   = rs_v // cnt
-                    dst[off+1] = rg_v // cnt
-                    dst[off+2] = rb_v // cnt
-                    if nc == 4: dst[off+3] = ra_v // cnt
-
-        tmp = bytearray(len(px))
+        w, h = pixbuf.get_width(), pixbuf.get_height()
         r = max(1, radius // 3)
-        for _ in range(3):
-            box_blur_pass(px, tmp, w, h, nc, rs, r)
-            px, tmp = tmp, px
+        src = pixbuf
+        factor = r // (BLUR_DOWNSCALE_RADIUS // 2) if downscale else 1
+        if r > BLUR_DOWNSCALE_RADIUS and factor > 1:
+            src = pixbuf.scale_simple(max(1, w // factor), max(1, h // factor),
+                                      GdkPixbuf.InterpType.BILINEAR)
+            r = max(1, r // factor)
+
+        sw, sh = src.get_width(), src.get_height()
+        nc = src.get_n_channels()
+        rs = src.get_rowstride()
+        px = _box_blur(src.get_pixels(), sw, sh, nc, rs, r)
 
         blurred = GdkPixbuf.Pixbuf.new_from_bytes(
-            GLib.Bytes.new(bytes(px)),
-            GdkPixbuf.Colorspace.RGB, nc == 4, 8, w, h, rs)
+            GLib.Bytes.new(px),
+            GdkPixbuf.Colorspace.RGB, nc == 4, 8, sw, sh, rs)
+        if src is not pixbuf:
+            blurred = blurred.scale_simple(w, h, GdkPixbuf.InterpType.BILINEAR)
         return blurred
     except Exception:
         return pixbuf
 
 
+# ─── Background cache ────────────────────────────────────────────────────────
+#
+# Backgrounds are decoded, cover-scaled to the monitor and optionally blurred
+# once, then stored as raw pixels so the lock screen can upload them straight
+# into a texture.  Entries are keyed by source path + mtime + size + target
+# resolution + blur radius; the file mtime doubles as the LRU timestamp.
+
+BG_CACHE_DIR       = os.path.join(CACHE_DIR, 'backgrounds')
+BG_CACHE_MAX_BYTES = 384 * 1024**2
+BG_BLUR_RADIUS     = 24
+_RAW_MAGIC  = b'FLBG'
+_RAW_HEADER = struct.Struct('<4sIIII')   # magic, width, height, channels, rowstride
+
+
+def _write_raw_pixbuf(cpath, pb):
+    """Atomically store a pixbuf's pixels with a small header."""
+    header = _RAW_HEADER.pack(_RAW_MAGIC, pb.get_width(), pb.get_height(),
+                              pb.get_n_channels(), pb.get_rowstride())
+    tmp = f'{cpath}.{os.getpid()}.{threading.get_ident()}.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(header)
+        f.write(pb.get_pixels())
+    os.replace(tmp, cpath)
+
+
+def _read_raw_pixels(cpath):
+    """Return (width, height, channels, rowstride, GLib.Bytes) or None."""
+    try:
+        with open(cpath, 'rb') as f:
+            data = f.read()
+        magic, w, h, nc, rs = _RAW_HEADER.unpack_from(data)
+        if magic != _RAW_MAGIC:
+            return None
+        os.utime(cpath)   # LRU timestamp
+        return w, h, nc, rs, GLib.Bytes.new(data[_RAW_HEADER.size:])
+    except Exception:
+        return None
+
+
+def _evict_lru(directory, max_bytes):
+    """Delete the least recently used cache files until under *max_bytes*."""
+    try:
+        entries = []
+        for e in os.scandir(directory):
+            if e.name.endswith('.rgb'):
+                st = e.stat()
+                entries.append((st.st_mtime, st.st_size, e.path))
+        total = sum(sz for _, sz, _ in entries)
+        for _, sz, fpath in sorted(entries):
+            if total <= max_bytes:
+                break
+            os.unlink(fpath)
+            total -= sz
+    except OSError:
+        pass
+
+
+def get_monitor_size():
+    """Pixel size of the primary monitor (scale factor applied)."""
+    try:
+        mon = Gdk.Display.get_default().get_monitors().get_item(0)
+        geo = mon.get_geometry()
+        scale = mon.get_scale_factor()
+        return geo.width * scale, geo.height * scale
+    except Exception:
+        return 1920, 1080
+
+
+def _bg_cache_path(path, size, blur_radius=0):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    key = f'{os.path.abspath(path)}|{st.st_mtime_ns}|{st.st_size}|' \
+          f'{size[0]}x{size[1]}|{blur_radius}'
+    return os.path.join(BG_CACHE_DIR,
+                        hashlib.sha1(key.encode()).hexdigest() + '.rgb')
+
+
+def load_cached_background(path, size, blur_radius=0):
+    """Return a Gdk.Texture for a cached variant, or None on a miss."""
+    cpath = _bg_cache_path(path, size, blur_radius)
+    if not cpath or not os.path.exists(cpath):
+        return None
+    raw = _read_raw_pixels(cpath)
+    if not raw:
+        return None
+    w, h, nc, rs, data = raw
+    fmt = Gdk.MemoryFormat.R8G8B8A8 if nc == 4 else Gdk.MemoryFormat.R8G8B8
+    return Gdk.MemoryTexture.new(w, h, fmt, data, rs)
+
+
+def _load_cover_pixbuf(path, size):
+    """Decode *path* scaled and center-cropped to exactly *size*."""
+    from gi.repository import GdkPixbuf
+    tw, th = size
+    _, sw, sh = GdkPixbuf.Pixbuf.get_file_info(path)
+    scale = max(tw / sw, th / sh)
+    dw, dh = max(tw, round(sw * scale)), max(th, round(sh * scale))
+    pb = GdkPixbuf.Pixbuf.new_from_file_at_scale(path, dw, dh, False)
+    if (dw, dh) != (tw, th):
+        pb = pb.new_subpixbuf((dw - tw) // 2, (dh - th) // 2, tw, th).copy()
+    return pb
+
+
+def build_background_cache(path, size, blur_radii=(0,)):
+    """Populate the cache for *path*; safe to call from a worker thread."""
+    try:
+        todo = [(r, _bg_cache_path(path, size, r)) for r in blur_radii]
+        todo = [(r, c) for r, c in todo if c and not os.path.exists(c)]
+        if not todo:
+            return
+        os.makedirs(BG_CACHE_DIR, exist_ok=True)
+        base = _load_cover_pixbuf(path, size)
+        for radius, cpath in todo:
+            _write_raw_pixbuf(cpath, blur_pixbuf(base, radius) if radius else base)
+        _evict_lru(BG_CACHE_DIR, BG_CACHE_MAX_BYTES)
+    except Exception as exc:
+        print(f'[bg-cache] {path}: {exc}', file=sys.stderr)
+
+
+def background_blur_radii(cfg):
+    # Without numpy a monitor-sized blur takes minutes of pure-Python time
+    # holding the GIL, so frosting is off rather than starving the UI.
+    if cfg.get('frosted_blur') and np is not None:
+        return (0, BG_BLUR_RADIUS)
+    return (0,)
+
+
+class FrostBin(Gtk.Widget):
+    """
+    Wraps a card and paints the blurred background behind it, aligned with
+    the fullscreen wallpaper, so the translucent card looks like frosted glass.
+    """
+
+    def __init__(self, child, radius=20):
+        super().__init__()
+        self.set_layout_manager(Gtk.BinLayout())
+        self._child = child
+        self._radius = radius
+        self._texture = None
+        child.set_parent(self)
+
+    def set_texture(self, texture):
+        self._texture = texture
+        self.queue_draw()
+
+    def do_snapshot(self, snapshot):
+        w, h = self.get_width(), self.get_height()
+        root = self.get_root()
+        if self._texture and self._child.get_visible() and w > 0 and h > 0 and root:
+            ok, origin = self.compute_point(root, Graphene.Point().init(0, 0))
+            if ok:
+                clip = Gsk.RoundedRect()
+                clip.init_from_rect(Graphene.Rect().init(0, 0, w, h), self._radius)
+                snapshot.push_rounded_clip(clip)
+                snapshot.append_texture(self._texture, Graphene.Rect().init(
+                    -origin.x, -origin.y, root.get_width(), root.get_height()))
+                snapshot.pop()
+        self.snapshot_child(self._child, snapshot)
+
+    def do_dispose(self):
+        if self._child:
+            self._child.unparent()
+            self._child = None
+
+
+
+class ProgressBar(Gtk.Widget):
+    """
+    Thin playback progress bar drawn as a single rounded colour node.  The
+    position is extrapolated from the last known anchor on the frame clock
+    while playing, so it moves smoothly at the display's refresh rate and
+    costs a redraw, never a relayout; the fill is computed from the width
+    at draw time.  Colour comes from the CSS `color` of .sp-progress.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.add_css_class('sp-progress')
+        self.set_hexpand(True)
+        self._pos = 0          # µs at _anchor
+        self._len = 0
+        self._anchor = 0       # GLib monotonic µs
+        self._playing = False
+        self._tick_id = 0
+        self._drawn = -1.0     # fill width last drawn, in px
+
+    def set_progress(self, position, length, playing):
+        self._pos, self._len, self._playing = position, length, playing
+        self._anchor = GLib.get_monotonic_time()
+        if playing and length > 0 and not self._tick_id:
+            self._tick_id = self.add_tick_callback(self._on_tick)
+        elif not (playing and length > 0) and self._tick_id:
+            self.remove_tick_callback(self._tick_id)
+            self._tick_id = 0
+        self.queue_draw()
+
+    def _fraction(self, now):
+        if self._len <= 0:
+            return 0.0
+        pos = self._pos + (now - self._anchor if self._playing else 0)
+        return min(max(pos / self._len, 0.0), 1.0)
+
+    def _on_tick(self, widget, clock):
+        fw = self.get_width() * self._fraction(clock.get_frame_time())
+        if abs(fw - self._drawn) >= 0.25:
+            self.queue_draw()
+        return GLib.SOURCE_CONTINUE
+
+    def do_measure(self, orientation, for_size):
+        if orientation == Gtk.Orientation.VERTICAL:
+            return 3, 3, -1, -1
+        return 0, 0, -1, -1
+
+    def do_snapshot(self, snapshot):
+        w, h = self.get_width(), self.get_height()
+        clock = self.get_frame_clock()
+        now = clock.get_frame_time() if clock else GLib.get_monotonic_time()
+        fw = w * self._fraction(now)
+        self._drawn = fw
+        if fw <= 0 or h <= 0:
+            return
+        rect = Graphene.Rect().init(0, 0, fw, h)
+        clip = Gsk.RoundedRect()
+        clip.init_from_rect(rect, h / 2)
+        snapshot.push_rounded_clip(clip)
+        color = (self.get_color() if hasattr(self, 'get_color')      # GTK >= 4.10
+                 else self.get_style_context().get_color())
+        snapshot.append_color(color, rect)
+        snapshot.pop()
+
+    def do_unmap(self):
+        if self._tick_id:
+            self.remove_tick_callback(self._tick_id)
+            self._tick_id = 0
+        Gtk.Widget.do_unmap(self)
+
+    def do_map(self):
+        Gtk.Widget.do_map(self)
+        if self._playing and self._len > 0 and not self._tick_id:
+            self._tick_id = self.add_tick_callback(self._on_tick)
+
+
+EQ_BARS     = 24
+EQ_MIN      = 3        # px, bar height when idle
+EQ_RATE_HZ  = 30       # spectrum messages per second
+EQ_FLOOR_DB = -70
+
+
+class SpectrumSource:
+    """
+    Live audio levels from the default sink's monitor through a GStreamer
+    `spectrum` element (pulsesrc, which PipeWire's pulse server also
+    serves, else pipewiresrc).  on_levels(list of 0..1, one per bar) runs
+    on the main loop at most EQ_RATE_HZ times a second.  The pipeline only
+    runs between start() and stop().
+    """
+
+    def __init__(self, bars, on_levels):
+        self._bars = bars
+        self._on_levels = on_levels
+        self._pipeline = None
+        self._groups = None
+        self._running = False
+        try:
+            gi.require_version('Gst', '1.0')
+            from gi.repository import Gst
+            Gst.init(None)
+            self._Gst = Gst
+            if Gst.ElementFactory.find('pulsesrc'):
+                src = 'pulsesrc device=@DEFAULT_MONITOR@'
+            elif Gst.ElementFactory.find('pipewiresrc'):
+                src = 'pipewiresrc stream-properties="props,stream.capture.sink=true"'
+            else:
+                return
+            bands = bars * 8
+            self._pipeline = Gst.parse_launch(
+                f'{src} ! audioconvert ! audio/x-raw,channels=1 ! '
+                f'spectrum bands={bands} threshold={EQ_FLOOR_DB} '
+                f'interval={1_000_000_000 // EQ_RATE_HZ} post-messages=true '
+                f'message-magnitude=true ! fakesink sync=false')
+            # Bands are linear in frequency; group them log-spaced per bar,
+            # skipping bin 0 (DC) and giving every bar at least one own bin.
+            edges = [1]
+            for i in range(1, bars + 1):
+                edges.append(min(max(round(bands ** (i / bars)), edges[-1] + 1), bands))
+            self._groups = list(zip(edges, edges[1:]))
+            bus = self._pipeline.get_bus()
+            bus.add_signal_watch()
+            bus.connect('message::element', self._on_message)
+        except Exception:
+            self._pipeline = None
+
+    @property
+    def available(self):
+        return self._pipeline is not None
+
+    def start(self):
+        if self._pipeline and not self._running:
+            self._running = True
+            self._pipeline.set_state(self._Gst.State.PLAYING)
+
+    def stop(self):
+        if self._pipeline and self._running:
+            self._running = False
+            self._pipeline.set_state(self._Gst.State.NULL)
+
+    def close(self):
+        if self._pipeline:
+            self.stop()
+            self._pipeline.get_bus().remove_signal_watch()
+            self._pipeline = None
+
+    def _on_message(self, bus, msg):
+        st = msg.get_structure()
+        if not st or st.get_name() != 'spectrum':
+            return
+        try:
+            mags = list(st.get_value('magnitude'))
+        except Exception:
+            import re
+            m = re.search(r'magnitude=\(float\)[{<]([^}>]*)', st.to_string())
+            if not m:
+                return
+            mags = [float(v) for v in m.group(1).split(',')]
+        span = -EQ_FLOOR_DB
+        self._on_levels([
+            (max(mags[lo:hi]) - EQ_FLOOR_DB) / span if hi <= len(mags) else 0.0
+            for lo, hi in self._groups])
+
+
+class EqWidget(Gtk.Widget):
+    """
+    Spotify card equalizer: all bars are drawn by one widget as colour
+    nodes from do_snapshot, so nothing is laid out per frame.  Bars step
+    EQ_RATE_HZ times a second (the spectrum's own rate) rather than at the
+    display's refresh rate, following set_levels() when a SpectrumSource
+    feeds it and a synthetic bounce otherwise.  When inactive (paused,
+    blanked, unmapped) the timer is removed and it costs nothing.
+    Colour comes from the CSS `color` of .eq-bar.
+    """
+
+    def __init__(self, bars=EQ_BARS):
+        super().__init__()
+        self.add_css_class('eq-bar')
+        self.set_hexpand(True)
+        self._n = bars
+        self._levels = [0.0] * bars      # shown, 0..1
+        self._target = None              # latest spectrum levels, if any
+        self._active = False
+        self._tick_id = 0
+        # Per-bar frequencies/phases for the synthetic bounce.
+        self._freq = [0.75 + (i * 7 % 12) / 12 * 0.6 for i in range(bars)]
+        self._phase = [i * 2.399 for i in range(bars)]
+
+    def set_active(self, active):
+        if active == self._active:
+            return
+        self._active = active
+        if not active:
+            self._levels = [0.0] * self._n
+            self._target = None
+            self.queue_draw()
+        self._sync_tick()
+
+    def set_levels(self, levels):
+        self._target = levels
+
+    def _sync_tick(self):
+        want = self._active and self.get_mapped()
+        if want and not self._tick_id:
+            self._tick_id = GLib.timeout_add(1000 // EQ_RATE_HZ, self._on_tick)
+        elif not want and self._tick_id:
+            GLib.source_remove(self._tick_id)
+            self._tick_id = 0
+
+    def _on_tick(self):
+        import math
+        t = GLib.get_monotonic_time() / 1e6
+        if self._target is not None:
+            target = self._target
+        else:
+            target = [0.45 + 0.4 * math.sin(t * 2 * math.pi * f + p) *
+                      math.sin(t * 1.3 + p * 0.5)
+                      for f, p in zip(self._freq, self._phase)]
+        # Fast attack, slow release (per EQ_RATE_HZ step).
+        self._levels = [lv + (tg - lv) * (0.85 if tg > lv else 0.35)
+                        for lv, tg in zip(self._levels, target)]
+        self.queue_draw()
+        return GLib.SOURCE_CONTINUE
+
+    def do_measure(self, orientation, for_size):
+        if orientation == Gtk.Orientation.VERTICAL:
+            return EQ_MIN, 28, -1, -1
+        return self._n * 2, self._n * 2, -1, -1
+
+    def do_snapshot(self, snapshot):
+        w, h = self.get_width(), self.get_height()
+        if w <= 0 or h <= 0:
+            return
+        color = (self.get_color() if hasattr(self, 'get_color')      # GTK >= 4.10
+                 else self.get_style_context().get_color())
+        slot = w / self._n
+        bw = max(1.0, slot - 2)
+        for i, lv in enumerate(self._levels):
+            bh = EQ_MIN + (h - EQ_MIN) * min(max(lv, 0.0), 1.0)
+            snapshot.append_color(color, Graphene.Rect().init(
+                i * slot + 1, h - bh, bw, bh))
+
+    def do_map(self):
+        Gtk.Widget.do_map(self)
+        self._sync_tick()
+
+    def do_unmap(self):
+        if self._tick_id:
+            GLib.source_remove(self._tick_id)
+            self._tick_id = 0
+        Gtk.Widget.do_unmap(self)
+
 CSS = """
 window { background-color: #080810; }
 
@@ -586,7 +2911,7 @@ window { background-color: #080810; }
 .sp-progress-bg {
     background-color: rgba(255,255,255,0.12); border-radius: 3px; min-height: 3px;
 }
-.sp-progress-fill { background-color: #1DB954; border-radius: 3px; min-height: 3px; }
+.sp-progress      { color: #1DB954; min-height: 3px; }
 .sp-playing-dot  { color: #1DB954; font-size: 8px; }
 
 .sp-marquee-clip { overflow: hidden; min-width: 0; }
@@ -601,32 +2926,7 @@ window { background-color: #080810; }
 .sp-artist.marquee { animation: sp-marquee 11s linear infinite; animation-delay: 1s; }
 .sp-album.marquee  { animation: sp-marquee 12s linear infinite; animation-delay: 2s; }
 
-.eq-bar { background-color:#1DB954; border-radius:2px 2px 0 0; margin-left:1px; margin-right:1px; }
-@keyframes eq-bounce-1  {0%{min-height:4px}  25%{min-height:18px} 50%{min-height:8px}  75%{min-height:14px} 100%{min-height:4px} }
-@keyframes eq-bounce-2  {0%{min-height:10px} 30%{min-height:4px}  60%{min-height:20px} 80%{min-height:6px}  100%{min-height:10px}}
-@keyframes eq-bounce-3  {0%{min-height:16px} 20%{min-height:6px}  50%{min-height:22px} 70%{min-height:10px} 100%{min-height:16px}}
-@keyframes eq-bounce-4  {0%{min-height:6px}  35%{min-height:20px} 55%{min-height:4px}  85%{min-height:16px} 100%{min-height:6px} }
-@keyframes eq-bounce-5  {0%{min-height:12px} 20%{min-height:22px} 45%{min-height:6px}  65%{min-height:18px} 100%{min-height:12px}}
-@keyframes eq-bounce-6  {0%{min-height:8px}  30%{min-height:14px} 55%{min-height:4px}  75%{min-height:20px} 100%{min-height:8px} }
-@keyframes eq-bounce-7  {0%{min-height:18px} 25%{min-height:6px}  50%{min-height:24px} 80%{min-height:8px}  100%{min-height:18px}}
-@keyframes eq-bounce-8  {0%{min-height:4px}  40%{min-height:16px} 60%{min-height:8px}  80%{min-height:20px} 100%{min-height:4px} }
-@keyframes eq-bounce-9  {0%{min-height:14px} 20%{min-height:4px}  50%{min-height:18px} 75%{min-height:10px} 100%{min-height:14px}}
-@keyframes eq-bounce-10 {0%{min-height:8px}  30%{min-height:22px} 55%{min-height:6px}  70%{min-height:16px} 100%{min-height:8px} }
-@keyframes eq-bounce-11 {0%{min-height:20px} 25%{min-height:8px}  50%{min-height:4px}  75%{min-height:18px} 100%{min-height:20px}}
-@keyframes eq-bounce-12 {0%{min-height:6px}  35%{min-height:24px} 60%{min-height:10px} 85%{min-height:4px}  100%{min-height:6px} }
-.eq-bar-1  {animation:eq-bounce-1  1.1s  ease-in-out infinite}
-.eq-bar-2  {animation:eq-bounce-2  0.9s  ease-in-out infinite}
-.eq-bar-3  {animation:eq-bounce-3  1.3s  ease-in-out infinite}
-.eq-bar-4  {animation:eq-bounce-4  0.8s  ease-in-out infinite}
-.eq-bar-5  {animation:eq-bounce-5  1.2s  ease-in-out infinite}
-.eq-bar-6  {animation:eq-bounce-6  1.0s  ease-in-out infinite}
-.eq-bar-7  {animation:eq-bounce-7  0.85s ease-in-out infinite}
-.eq-bar-8  {animation:eq-bounce-8  1.15s ease-in-out infinite}
-.eq-bar-9  {animation:eq-bounce-9  0.95s ease-in-out infinite}
-.eq-bar-10 {animation:eq-bounce-10 1.25s ease-in-out infinite}
-.eq-bar-11 {animation:eq-bounce-11 0.75s ease-in-out infinite}
-.eq-bar-12 {animation:eq-bounce-12 1.05s ease-in-out infinite}
-.eq-bar.paused { animation:none; min-height:3px; }
+.eq-bar        { color:#1DB954; }
 .eq-container  { background-color:transparent; }
 
 /* Weather */
@@ -785,54 +3085,204 @@ window { background-color: #080810; }
 }
 """
 
+_css_provider = None
+
+def _install_css():
+    """Parse CSS once per process; a resident daemon builds many windows."""
+    global _css_provider
+    if _css_provider:
+        return
+    _css_provider = Gtk.CssProvider()
+    _css_provider.load_from_data(CSS.encode())
+    Gtk.StyleContext.add_provider_for_display(
+        Gdk.Display.get_default(), _css_provider,
+        Gtk.STYLE_PROVIDER_PRIORITY_APPLICATION)
+
+
+ACCENT_PROVIDERS = 16
+_accent_provs = collections.OrderedDict()   # (vibrant, muted) -> CssProvider
+
+def _accent_provider(palette):
+    """Spotify accent CSS for a palette, parsed once per process (LRU)."""
+    key = (palette['vibrant'], palette['muted'])
+    prov = _accent_provs.pop(key, None)
+    if prov is None:
+        r, g, b = palette['vibrant']
+        mr, mg, mb = palette['muted']
+        css = f"""
+        .sp-card {{
+            background: linear-gradient(135deg,
+                rgba(18,18,18,0.92) 0%,
+                rgba({mr//4},{mg//4},{mb//4},0.92) 100%);
+            border: 1px solid rgba({r},{g},{b},0.40);
+            border-radius: 20px; padding: 14px 16px;
+        }}
+        .sp-progress       {{ color: rgb({r},{g},{b}); }}
+        .eq-bar            {{ color: rgb({r},{g},{b}); }}
+        .sp-badge          {{ color: rgb({r},{g},{b}); }}
+        .sp-playing-dot    {{ color: rgb({r},{g},{b}); }}
+        """
+        prov = Gtk.CssProvider()
+        prov.load_from_data(css.encode())
+    _accent_provs[key] = prov
+    while len(_accent_provs) > ACCENT_PROVIDERS:
+        _accent_provs.popitem(last=False)
+    return prov
+
+
+# FANCY_LOCKSCREEN_TIMING=1 prints time-to-first-frame; "dismiss" also
+# closes the lock again right after it (used by benchmarks/bench_startup.py)
+_TIMING = os.environ.get('FANCY_LOCKSCREEN_TIMING', '')
+# FANCY_LOCKSCREEN_DEBUG=1 prints cache/scheduler counters on unlock
+_DEBUG = bool(os.environ.get('FANCY_LOCKSCREEN_DEBUG'))
+
+def _process_age():
+    """Seconds since this process was started."""
+    try:
+        with open('/proc/self/stat') as f:
+            start = int(f.read().rsplit(')', 1)[1].split()[19])
+        return (time.clock_gettime(time.CLOCK_BOOTTIME) -
+                start / os.sysconf('SC_CLK_TCK'))
+    except Exception:
+        return 0.0
+
+
+class ViewModel:
+    """
+    Last value pushed to each (widget, property) of the cards.  Setters go
+    through here so an unchanged value never reaches GTK (and never
+    invalidates layout); stats counts applied vs suppressed updates.
+    """
+
+    def __init__(self):
+        self.stats = {'applied': 0, 'suppressed': 0}
+        self._last = {}
+
+    def push(self, obj, prop, value, setter):
+        key = (obj, prop)
+        if key in self._last and self._last[key] == value:
+            self.stats['suppressed'] += 1
+            return False
+        self._last[key] = value
+        self.stats['applied'] += 1
+        setter(value)
+        return True
+
+    def label(self, widget, text):
+        return self.push(widget, 'label', text, widget.set_label)
+
+    def size(self, widget, width, height):
+        return self.push(widget, 'size', (width, height),
+                         lambda v: widget.set_size_request(*v))
+
+    def visible(self, widget, on):
+        return self.push(widget, 'visible', bool(on), widget.set_visible)
+
+    def child(self, stack, name):
+        return self.push(stack, 'child', name, stack.set_visible_child_name)
+
+    def css(self, widget, cls, on):
+        return self.push(widget, 'css:' + cls, bool(on),
+                         lambda v: (widget.add_css_class if v
+                                    else widget.remove_css_class)(cls))
+
 
 class LockScreen(Gtk.ApplicationWindow):
 
-    def __init__(self, app, cfg):
+    def __init__(self, app, cfg, show=True):
         super().__init__(application=app)
         self.cfg = cfg
+        self._shown = False
+        self._shown_at = 0.0
         self._timers = []
         self._attempts = 0
         self._sp_last_position = 0
         self._sp_last_fetch_time = 0.0
         self._sp_length = 0
         self._sp_playing = False
-        self._accent_color = (29, 185, 84)
+        self._accent_color = None
         self._accent_prov = None
+        self._dim_prov = None
         self._media_player = None
+        self._frost_bins = []
+        self._sched = WidgetScheduler()
+        self._mpris = None
+        self._sysmon = None
+        self._sysmon_lock = threading.Lock()
+        self._widgets_running = False
+        self._sp_info = None
+        self._sp_art = None
+        self._sp_art_url = ''
+        self._frost_texture = None
+        self._view = ViewModel()
+        self._notif_pending = False
+        self._second_id = 0
+        self._date_shown = None
+        self._power = None
+        self._eq_playing = False
+        self._spectrum = None
+        self._gif_player = None
+        self._pipelines = MediaPipelines()
+        self._auth_seq = 0
+        self._auth_pending = 0
 
         self.set_title('LockScreen')
         self.set_decorated(False)
         self.fullscreen()
         self.connect('close-request', lambda *_: True)
 
-        prov = Gtk.CssProvider()
-        prov.load_from_data(CSS.encode())
-        Gtk.StyleContext.add_provider_for_display(
-            Gdk.Display.get_default(), prov,
-            Gtk.STYLE_PROVIDER_PRIORITY_APPLICATION)
-
+        _install_css()
         self._build()
+        self.connect('destroy', self._on_destroy)
+        self.connect('notify::is-active', self._on_active_change)
+        if _TIMING:
+            self.connect('map', self._report_first_frame)
+        if show:
+            self.show_lock()
+
+    def show_lock(self):
+        """Start the clock and widgets and put the window on screen."""
+        if self._shown:
+            self.present()
+            return
+        self._shown = True
+        self._shown_at = time.monotonic()
+        self._widgets_running = True
         self._start_clock()
         self._start_widgets()
         self.present()
         GLib.timeout_add(300, self._initial_focus)
-        self.connect('notify::is-active', self._on_active_change)
 
-        if cfg.get('show_notifications'):
-            threading.Thread(
-                target=start_notif_spy,
-                args=(self._on_notification,),
-                daemon=True).start()
+        if self.cfg.get('show_notifications'):
+            self.get_application().start_notif_spy()
+
+    def _report_first_frame(self, *_):
+        clock = self.get_frame_clock()
+        def _after_paint(clk):
+            clk.disconnect(handler)
+            now = time.monotonic()
+            app = self.get_application()
+            if app.resident:
+                since = f'{(now - self._shown_at) * 1000:.0f} ms after activate'
+            else:
+                since = f'{_process_age() * 1000:.0f} ms after process start'
+            print(f'[timing] first frame {since} (monotonic {now:.6f})',
+                  file=sys.stderr, flush=True)
+            if _TIMING == 'dismiss':
+                GLib.idle_add(app.dismiss)
+        handler = clock.connect('after-paint', _after_paint)
 
     def _on_notification(self, app_name, summary, body):
-        global _notifications
-        _notifications.append({
-            'app': app_name, 'summary': summary, 'body': body,
-            'time': datetime.datetime.now().strftime('%H:%M'),
-        })
-        _notifications = _notifications[-5:]
+        _notif_store.add(app_name, summary, body)
+        # A burst of Notify calls is rendered once, on the next frame.
+        if not self._notif_pending:
+            self._notif_pending = True
+            self.add_tick_callback(self._flush_notifications)
+
+    def _flush_notifications(self, *_):
+        self._notif_pending = False
         self._update_notifications()
+        return GLib.SOURCE_REMOVE
 
 
     def _build(self):
@@ -842,24 +3292,25 @@ class LockScreen(Gtk.ApplicationWindow):
         # Background
         live_path = self.cfg.get('live_wallpaper', '')
         live_enabled = self.cfg.get('live_wallpaper_enabled', False)
-        if live_enabled and live_path and os.path.exists(live_path):
+        self._tod = get_tod_image(self.cfg)
+        self._live = bool(live_enabled and live_path and os.path.exists(live_path))
+        if self._live:
             self._setup_live_wallpaper(overlay, live_path)
         else:
             self._bg = Gtk.Picture()
             self._bg.set_content_fit(Gtk.ContentFit.COVER)
             self._bg.set_hexpand(True)
             self._bg.set_vexpand(True)
-            bg_path, _ = get_tod_image(self.cfg)
+            bg_path, _ = self._tod
             if bg_path and os.path.exists(bg_path):
-                self._bg.set_filename(bg_path)
+                self._load_background(bg_path)
             overlay.set_child(self._bg)
 
-        _, dim_val = get_tod_image(self.cfg)
         self._dim_box = Gtk.Box()
         self._dim_box.set_hexpand(True)
         self._dim_box.set_vexpand(True)
         self._dim_box.set_can_target(False)
-        self._update_dim(dim_val)
+        self._update_dim(self._tod[1])
         overlay.add_overlay(self._dim_box)
 
         content = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=0)
@@ -891,15 +3342,15 @@ class LockScreen(Gtk.ApplicationWindow):
 
         self._weather_card = self._build_weather_card()
         self._weather_card.set_visible(bool(self.cfg.get('show_weather')))
-        top_row.append(self._weather_card)
+        top_row.append(self._frosted(self._weather_card))
 
         self._sysmon_card = self._build_sysmon_card()
         self._sysmon_card.set_visible(bool(self.cfg.get('show_sysmon')))
-        top_row.append(self._sysmon_card)
+        top_row.append(self._frosted(self._sysmon_card))
 
         self._notif_card = self._build_notif_card()
         self._notif_card.set_visible(bool(self.cfg.get('show_notifications')))
-        top_row.append(self._notif_card)
+        top_row.append(self._frosted(self._notif_card))
 
         content.append(self._spacer(16))
 
@@ -909,15 +3360,15 @@ class LockScreen(Gtk.ApplicationWindow):
 
         self._sp_card = self._build_spotify_card()
         self._sp_card.set_visible(bool(self.cfg.get('show_spotify')))
-        widgets_row.append(self._sp_card)
+        widgets_row.append(self._frosted(self._sp_card))
 
         self._vs_card = self._build_vscodium_card()
         self._vs_card.set_visible(bool(self.cfg.get('show_vscodium')))
-        widgets_row.append(self._vs_card)
+        widgets_row.append(self._frosted(self._vs_card, 18))
 
         self._media_card = self._build_media_widget_card()
         self._media_card.set_visible(bool(self.cfg.get('show_media_widget')))
-        widgets_row.append(self._media_card)
+        widgets_row.append(self._frosted(self._media_card))
 
         content.append(self._spacer(28))
 
@@ -952,80 +3403,73 @@ class LockScreen(Gtk.ApplicationWindow):
         content.append(bot_spring)
 
 
+    def _load_background(self, path):
+        """Show the wallpaper from the pre-scaled cache, filling it if needed."""
+        size = get_monitor_size()
+        radii = background_blur_radii(self.cfg)
+        texture = load_cached_background(path, size)
+        if texture:
+            self._bg.set_paintable(texture)
+        frost = (load_cached_background(path, size, BG_BLUR_RADIUS)
+                 if BG_BLUR_RADIUS in radii else None)
+        if frost:
+            self._set_frost_texture(frost)
+        if not texture or (BG_BLUR_RADIUS in radii and not frost):
+            # On a miss the image is decoded on the worker too, never here.
+            def _build_cache():
+                build_background_cache(path, size, radii)
+                return (load_cached_background(path, size),
+                        load_cached_background(path, size, BG_BLUR_RADIUS)
+                        if BG_BLUR_RADIUS in radii else None)
+            def _done(result):
+                base, blurred = result
+                if base and not texture:
+                    self._bg.set_paintable(base)
+                if blurred:
+                    self._set_frost_texture(blurred)
+            self._sched.submit('bg-cache', _build_cache, on_done=_done)
+
+    def _frosted(self, card, radius=20):
+        """Wrap card in a FrostBin when frosting is on; the wrapper follows its visibility."""
+        if BG_BLUR_RADIUS not in background_blur_radii(self.cfg):
+            return card
+        frost = FrostBin(card, radius)
+        card.bind_property('visible', frost, 'visible', GObject.BindingFlags.SYNC_CREATE)
+        frost.set_texture(self._frost_texture)
+        self._frost_bins.append(frost)
+        return frost
+
+    def _set_frost_texture(self, texture):
+        self._frost_texture = texture
+        for frost in self._frost_bins:
+            frost.set_texture(texture)
+        return False
+
+    def _on_destroy(self, *_):
+        self._pipelines.shutdown()
+        self._sched.shutdown()
+        # Display-wide, so it would outlive this window in the resident daemon
+        if self._accent_prov:
+            Gtk.StyleContext.remove_provider_for_display(
+                Gdk.Display.get_default(), self._accent_prov)
+            self._accent_prov = None
+
     def _setup_live_wallpaper(self, overlay, path):
         """
-        Live wallpaper via GStreamer playbin.
-        • Надёжный loop через about-to-finish + EOS bus watch (работает с MP4/WebM/GIF)
+        Live wallpaper through the window's MediaPipelines, decoded at no
+        more than the monitor's size.
         • Громкость из конфига (0.0–1.0), по умолчанию 0 = без звука
         При ошибке — статичная Gtk.Picture как fallback.
         """
-        self._live_pipeline = None
         try:
-            gi.require_version('Gst', '1.0')
-            gi.require_version('GstVideo', '1.0')
-            from gi.repository import Gst, GstVideo
-            Gst.init(None)
-
-            pipeline = Gst.ElementFactory.make('playbin', 'live-wallpaper')
-            if not pipeline:
-                raise RuntimeError('GStreamer playbin not available')
-
-            sink = (Gst.ElementFactory.make('gtk4paintablesink', 'vsink') or
-                    Gst.ElementFactory.make('gtksink', 'vsink'))
-            if not sink:
-                raise RuntimeError('No GTK GStreamer video sink found. '
-                                   'Install gstreamer1.0-gtk3 or gstreamer1.0-plugins-good')
-
-            pipeline.set_property('video-sink', sink)
-            pipeline.set_property('volume',
-                max(0.0, min(1.0, float(self.cfg.get('live_wallpaper_volume', 0.0)))))
-
-            uri = Gio.File.new_for_path(path).get_uri()
-            pipeline.set_property('uri', uri)
-
-            def _on_about_to_finish(pl):
-                pl.seek_simple(
-                    Gst.Format.TIME,
-                    Gst.SeekFlags.FLUSH | Gst.SeekFlags.KEY_UNIT,
-                    0)
-
-            pipeline.connect('about-to-finish', _on_about_to_finish)
-
-            bus = pipeline.get_bus()
-            bus.add_signal_watch()
-
-            def _on_bus_msg(bus, msg, pl):
-                t = msg.type
-                if t == Gst.MessageType.EOS:
-                    pl.seek_simple(
-                        Gst.Format.TIME,
-                        Gst.SeekFlags.FLUSH | Gst.SeekFlags.KEY_UNIT,
-                        0)
-                    pl.set_state(Gst.State.PLAYING)
-                elif t == Gst.MessageType.ERROR:
-                    err, dbg = msg.parse_error()
-                    print(f'[live-wallpaper] GStreamer error: {err} / {dbg}',
-                          file=sys.stderr)
-
-            bus.connect('message', _on_bus_msg, pipeline)
-
-            try:
-                paintable = sink.get_property('paintable')
-                widget = Gtk.Picture()
-                widget.set_paintable(paintable)
-                widget.set_content_fit(Gtk.ContentFit.COVER)
-            except Exception:
-                widget = sink.get_property('widget')
-
+            volume = max(0.0, min(1.0, float(self.cfg.get('live_wallpaper_volume', 0.0))))
+            widget = self._pipelines.open('live-wallpaper', path, Gtk.ContentFit.COVER,
+                                          get_monitor_size(), volume)
             widget.set_hexpand(True)
             widget.set_vexpand(True)
             overlay.set_child(widget)
             self._bg = widget
 
-            pipeline.set_state(Gst.State.PLAYING)
-            self._live_pipeline = pipeline
-            self._live_gst_sink = sink   # prevent GC
-
         except Exception as exc:
             print(f'[live-wallpaper] Fallback to static bg: {exc}', file=sys.stderr)
             self._bg = Gtk.Picture()
@@ -1143,7 +3587,8 @@ class LockScreen(Gtk.ApplicationWindow):
         self._media_stack.set_visible_child_name('empty')
         card.append(self._media_stack)
 
-        self._load_media_file(self.cfg.get('media_widget_file', ''))
+        if self.cfg.get('show_media_widget'):
+            self._load_media_file(self.cfg.get('media_widget_file', ''))
         return card
 
     def _load_media_file(self, path):
@@ -1160,73 +3605,39 @@ class LockScreen(Gtk.ApplicationWindow):
             self._load_video(path)
 
     def _load_gif(self, path):
-        """Load animated GIF using GdkPixbufAnimation."""
-        try:
-            child = self._media_gif_box.get_first_child()
-            while child:
-                next_child = child.get_next_sibling()
-                self._media_gif_box.remove(child)
-                child = next_child
-
-            from gi.repository import GdkPixbuf, GLib as GL
-            anim = GdkPixbuf.PixbufAnimation.new_from_file(path)
-
-            if anim.is_static_image():
-                pixbuf = anim.get_static_image()
-                texture = Gdk.Texture.new_for_pixbuf(pixbuf)
-                picture = Gtk.Picture()
-                picture.set_paintable(texture)
-                picture.set_content_fit(Gtk.ContentFit.CONTAIN)
-                max_w = 400
-                w = min(pixbuf.get_width(), max_w)
-                h = int(pixbuf.get_height() * (w / pixbuf.get_width()))
-                picture.set_size_request(w, h)
-                self._media_gif_box.append(picture)
-            else:
-                self._gif_anim = anim
-                self._gif_iter = anim.get_iter(None)
-                picture = Gtk.Picture()
-                picture.set_content_fit(Gtk.ContentFit.CONTAIN)
-                first_pb = self._gif_iter.get_pixbuf()
-                max_w = 400
-                w = min(first_pb.get_width(), max_w)
-                h = int(first_pb.get_height() * (w / first_pb.get_width()))
-                picture.set_size_request(w, h)
-                self._media_picture_gif = picture
-                self._gif_picture_pixbuf_w = first_pb.get_width()
-                texture = Gdk.Texture.new_for_pixbuf(
-                    first_pb.scale_simple(w, h, GdkPixbuf.InterpType.BILINEAR))
-                picture.set_paintable(texture)
-                self._media_gif_box.append(picture)
-                self._tick_gif()
-
+        """Decode (and pre-scale) the GIF on a worker, then play it."""
+        if self._gif_player:
+            self._gif_player.detach()
+            self._gif_player = None
+        child = self._media_gif_box.get_first_child()
+        while child:
+            next_child = child.get_next_sibling()
+            self._media_gif_box.remove(child)
+            child = next_child
+        picture = Gtk.Picture()
+        picture.set_content_fit(Gtk.ContentFit.CONTAIN)
+        self._media_gif_box.append(picture)
+
+        def _ready(player):
+            self._gif_player = player
+            player.attach(picture)
             self._media_stack.set_visible_child_name('gif')
-        except Exception as e:
+
+        def _failed(e):
             print(f"GIF load error: {e}")
             self._media_stack.set_visible_child_name('empty')
 
-    def _tick_gif(self):
-        """Advance GIF frame."""
-        try:
-            from gi.repository import GdkPixbuf
-            self._gif_iter.advance(None)
-            delay = self._gif_iter.get_delay_time()
-            if delay < 10:
-                delay = 100
-            pb = self._gif_iter.get_pixbuf()
-            max_w = 400
-            orig_w = self._gif_picture_pixbuf_w
-            w = min(orig_w, max_w)
-            h = int(pb.get_height() * (w / orig_w))
-            scaled = pb.scale_simple(w, h, GdkPixbuf.InterpType.NEAREST)
-            texture = Gdk.Texture.new_for_pixbuf(scaled)
-            self._media_picture_gif.set_paintable(texture)
-            GLib.timeout_add(delay, self._tick_gif)
-        except Exception:
-            pass
+        def _decode():
+            try:
+                return GifPlayer(path).decode(), None
+            except Exception as e:
+                return None, e
+
+        self._sched.submit('gif', _decode,
+                           on_done=lambda r: _ready(r[0]) if r[0] else _failed(r[1]))
 
     def _load_video(self, path):
-        """Load video via GStreamer playbin with reliable loop (works for MP4/WebM/MKV)."""
+        """Play a muted, looping video (MP4/WebM/MKV) in the media card."""
         try:
             child = self._media_video_box.get_first_child()
             while child:
@@ -1234,59 +3645,11 @@ class LockScreen(Gtk.ApplicationWindow):
                 self._media_video_box.remove(child)
                 child = next_child
 
-            if hasattr(self, '_media_pipeline') and self._media_pipeline:
-                self._media_pipeline.set_state(
-                    __import__('gi').repository.Gst.State.NULL)
-                self._media_pipeline = None
-
-            gi.require_version('Gst', '1.0')
-            from gi.repository import Gst
-            Gst.init(None)
-
-            pipeline = Gst.ElementFactory.make('playbin', 'media-widget')
-            if not pipeline:
-                raise RuntimeError('GStreamer playbin not available')
-
-            sink = (Gst.ElementFactory.make('gtk4paintablesink', 'msink') or
-                    Gst.ElementFactory.make('gtksink', 'msink'))
-            if not sink:
-                raise RuntimeError('No GTK GStreamer video sink available')
-
-            pipeline.set_property('video-sink', sink)
-            pipeline.set_property('volume', 0.0)   # media widget is always muted
-            pipeline.set_property('uri', Gio.File.new_for_path(path).get_uri())
-
-            def _atf(pl):
-                pl.seek_simple(
-                    Gst.Format.TIME,
-                    Gst.SeekFlags.FLUSH | Gst.SeekFlags.KEY_UNIT,
-                    0)
-            pipeline.connect('about-to-finish', _atf)
-
-            bus = pipeline.get_bus()
-            bus.add_signal_watch()
-            def _bus_msg(bus, msg, pl):
-                if msg.type == Gst.MessageType.EOS:
-                    pl.seek_simple(Gst.Format.TIME,
-                                   Gst.SeekFlags.FLUSH | Gst.SeekFlags.KEY_UNIT, 0)
-                    pl.set_state(Gst.State.PLAYING)
-            bus.connect('message', _bus_msg, pipeline)
-
-            try:
-                paintable = sink.get_property('paintable')
-                widget = Gtk.Picture()
-                widget.set_paintable(paintable)
-                widget.set_content_fit(Gtk.ContentFit.CONTAIN)
-            except Exception:
-                widget = sink.get_property('widget')
-
+            widget = self._pipelines.open('media-widget', path, Gtk.ContentFit.CONTAIN,
+                                          MEDIA_VIDEO_MAX)
             widget.set_hexpand(True)
             widget.set_size_request(220, 165)
             self._media_video_box.append(widget)
-
-            pipeline.set_state(Gst.State.PLAYING)
-            self._media_pipeline = pipeline
-            self._media_gst_sink = sink
             self._media_player = widget
             self._media_stack.set_visible_child_name('video')
 
@@ -1409,6 +3772,44 @@ class LockScreen(Gtk.ApplicationWindow):
 
         self._notif_list = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=0)
         card.append(self._notif_list)
+        # Fixed pool of rows, rebound to new data by _update_notifications.
+        self._notif_rows = []
+        for i in range(NOTIF_ROWS):
+            if i:
+                sep = Gtk.Box()
+                sep.add_css_class('notif-sep')
+                sep.set_hexpand(True)
+                sep.set_visible(False)
+                self._notif_list.append(sep)
+            else:
+                sep = None
+            row = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=2)
+            row.set_visible(False)
+            top_row = Gtk.Box(spacing=6)
+            app_lbl = Gtk.Label()
+            app_lbl.add_css_class('notif-app')
+            app_lbl.set_halign(Gtk.Align.START)
+            app_lbl.set_hexpand(True)
+            top_row.append(app_lbl)
+            t_lbl = Gtk.Label()
+            t_lbl.add_css_class('notif-time')
+            top_row.append(t_lbl)
+            row.append(top_row)
+            smry = Gtk.Label()
+            smry.add_css_class('notif-summary')
+            smry.set_halign(Gtk.Align.START)
+            smry.set_ellipsize(Pango.EllipsizeMode.END)
+            smry.set_max_width_chars(28)
+            row.append(smry)
+            body = Gtk.Label()
+            body.add_css_class('notif-body')
+            body.set_halign(Gtk.Align.START)
+            body.set_ellipsize(Pango.EllipsizeMode.END)
+            body.set_max_width_chars(30)
+            body.set_visible(False)
+            row.append(body)
+            self._notif_list.append(row)
+            self._notif_rows.append((sep, row, app_lbl, t_lbl, smry, body))
 
         self._notif_empty = Gtk.Label(label=_t(self.cfg, 'notif_empty'))
         self._notif_empty.add_css_class('notif-empty')
@@ -1496,10 +3897,8 @@ class LockScreen(Gtk.ApplicationWindow):
         track_box = Gtk.Box()
         track_box.add_css_class('sp-progress-bg')
         track_box.set_hexpand(True)
-        self._sp_progress_fill = Gtk.Box()
-        self._sp_progress_fill.add_css_class('sp-progress-fill')
-        self._sp_progress_fill.set_size_request(0, 3)
-        track_box.append(self._sp_progress_fill)
+        self._sp_progress = ProgressBar()
+        track_box.append(self._sp_progress)
         prog_col.append(track_box)
         self._sp_track_container = track_box
 
@@ -1509,15 +3908,8 @@ class LockScreen(Gtk.ApplicationWindow):
         eq_row.set_halign(Gtk.Align.FILL)
         eq_row.set_hexpand(True)
         eq_row.set_size_request(-1, 28)
-        self._eq_bars = []
-        for i in range(1, 25):
-            bar = Gtk.Box()
-            bar.add_css_class('eq-bar')
-            bar.add_css_class(f'eq-bar-{((i-1) % 12) + 1}')
-            bar.set_valign(Gtk.Align.END)
-            bar.set_hexpand(True)
-            eq_row.append(bar)
-            self._eq_bars.append(bar)
+        self._eq = EqWidget()
+        eq_row.append(self._eq)
         prog_col.append(eq_row)
         card.append(prog_col)
 
@@ -1544,6 +3936,8 @@ class LockScreen(Gtk.ApplicationWindow):
         scroll.set_policy(Gtk.PolicyType.NEVER, Gtk.PolicyType.AUTOMATIC)
         scroll.set_size_request(-1, 130)
         self._vs_buf = Gtk.TextBuffer()
+        for name, props in HIGHLIGHT_TAGS.items():
+            self._vs_buf.create_tag(name, **props)
         tv = Gtk.TextView(buffer=self._vs_buf)
         tv.add_css_class('code-text')
         tv.set_editable(False)
@@ -1561,34 +3955,33 @@ class LockScreen(Gtk.ApplicationWindow):
         return b
 
     def _update_dim(self, val):
-        prov = Gtk.CssProvider()
-        prov.load_from_data(
+        if self._dim_prov is None:
+            self._dim_prov = Gtk.CssProvider()
+            ctx = self._dim_box.get_style_context()
+            ctx.add_provider(self._dim_prov, Gtk.STYLE_PROVIDER_PRIORITY_APPLICATION + 1)
+        self._dim_prov.load_from_data(
             f'* {{ background-color: rgba(0,0,0,{val}); }}'.encode())
-        ctx = self._dim_box.get_style_context()
-        ctx.add_provider(prov, Gtk.STYLE_PROVIDER_PRIORITY_APPLICATION + 1)
 
-    def _apply_accent_color(self, r, g, b):
-        if (r, g, b) == self._accent_color:
+    def refresh_tod(self):
+        """Re-pick the time-of-day background; a resident window may be hours old."""
+        tod = get_tod_image(self.cfg)
+        if tod == self._tod:
             return
-        self._accent_color = (r, g, b)
-        css = f"""
-        .sp-card {{
-            background: linear-gradient(135deg,
-                rgba(18,18,18,0.92) 0%,
-                rgba({r//5},{g//5},{b//5},0.92) 100%);
-            border: 1px solid rgba({r},{g},{b},0.40);
-            border-radius: 20px; padding: 14px 16px;
-        }}
-        .sp-progress-fill {{ background-color: rgb({r},{g},{b}); }}
-        .eq-bar            {{ background-color: rgb({r},{g},{b}); }}
-        .sp-badge          {{ color: rgb({r},{g},{b}); }}
-        .sp-playing-dot    {{ color: rgb({r},{g},{b}); }}
-        """
+        self._tod = tod
+        bg_path, dim = tod
+        self._update_dim(dim)
+        if not self._live and bg_path and os.path.exists(bg_path):
+            self._load_background(bg_path)
+
+    def _apply_accent_color(self, palette):
+        key = (palette['vibrant'], palette['muted'])
+        if key == self._accent_color:
+            return
+        self._accent_color = key
+        prov = _accent_provider(palette)
         if self._accent_prov:
             Gtk.StyleContext.remove_provider_for_display(
                 Gdk.Display.get_default(), self._accent_prov)
-        prov = Gtk.CssProvider()
-        prov.load_from_data(css.encode())
         Gtk.StyleContext.add_provider_for_display(
             Gdk.Display.get_default(), prov,
             Gtk.STYLE_PROVIDER_PRIORITY_APPLICATION + 10)
@@ -1596,58 +3989,166 @@ class LockScreen(Gtk.ApplicationWindow):
 
 
     def _start_clock(self):
+        """
+        Tick the clock and Spotify position on wall-clock second boundaries.
+        Ticking stops while the window is unmapped, suspended by the
+        compositor or the monitors are blanked, and resumes (re-aligned)
+        when it is visible again.
+        """
+        self._power = DisplayPowerWatcher(lambda _: self._update_ticking())
+        self.connect('map', lambda *_: self._update_ticking())
+        self.connect('unmap', lambda *_: self._update_ticking())
+        surface = self.get_surface()
+        if surface:
+            surface.connect('notify::state', lambda *_: self._update_ticking())
+        else:
+            self.connect('realize', lambda w: w.get_surface().connect(
+                'notify::state', lambda *_: self._update_ticking()))
+        self._update_ticking()
+
+    def _can_tick(self):
+        # A map after _stop_widgets (dismiss, monitor change) must not restart ticks
+        if not self._widgets_running or not self.get_mapped():
+            return False
+        if self._power and self._power.blanked:
+            return False
+        suspended = getattr(Gdk.ToplevelState, 'SUSPENDED', 0)   # GTK >= 4.12
+        surface = self.get_surface()
+        return not (suspended and surface and surface.get_state() & suspended)
+
+    def _update_ticking(self):
+        self._update_eq()
+        ticking = self._can_tick()
+        self._pipelines.set_playing(ticking)
+        if ticking:
+            if not self._second_id:
+                self._second_tick()
+        elif self._second_id:
+            GLib.source_remove(self._second_id)
+            self._second_id = 0
+
+    def _second_tick(self):
         self._tick()
-        self._timers.append(GLib.timeout_add(1000, self._tick))
+        self._tick_progress()
+        # Re-arm for just past the next whole second so ticks never drift.
+        ms = 1000 - int(time.time() * 1000) % 1000 + 5
+        self._second_id = GLib.timeout_add(ms, self._second_tick)
+        return GLib.SOURCE_REMOVE
 
     def _tick(self):
         now = datetime.datetime.now()
-        self._clock_lbl.set_label(now.strftime('%H:%M:%S'))
-        days   = _t(self.cfg, 'days')
-        months = _t(self.cfg, 'months')
-        self._date_lbl.set_label(
-            f"{days[now.weekday()]}, {now.day} {months[now.month-1]}")
-        return GLib.SOURCE_CONTINUE
+        self._view.label(self._clock_lbl, now.strftime('%H:%M:%S'))
+        today = now.date()
+        if today != self._date_shown:
+            self._date_shown = today
+            days   = _t(self.cfg, 'days')
+            months = _t(self.cfg, 'months')
+            self._view.label(
+                self._date_lbl,
+                f"{days[now.weekday()]}, {now.day} {months[now.month-1]}")
 
 
     def _start_widgets(self):
-        self._refresh()
-        self._timers.append(GLib.timeout_add_seconds(5, self._refresh))
-        self._timers.append(GLib.timeout_add(1000, self._tick_progress))
+        self._apply_spotify(None, None)
+        self._apply_vs(None)
+        self._apply_weather(self._peek_weather('weather'))
+        self._apply_weather_tomorrow(self._peek_weather('forecast'))
+        if self.cfg.get('show_notifications'):
+            self._update_notifications()
+        if self.cfg.get('show_spotify'):
+            if self.cfg.get('eq_spectrum'):
+                self._spectrum = SpectrumSource(EQ_BARS, self._eq.set_levels)
+            try:
+                self._mpris = MprisWatcher(self._on_player_change)
+            except Exception as e:
+                # No session bus: Spotify stays empty, the other widgets still run
+                print(f'[mpris] unavailable: {e}', file=sys.stderr)
+                self._mpris = None
+        if self.cfg.get('show_vscodium'):
+            self._sched.every('vscodium', 5, self._fetch_vs, self._apply_vs,
+                              timeout=10)
+        if self.cfg.get('show_weather') and self.cfg.get('weather_api_key'):
+            self._sched.every('weather', 60, self._fetch_weather,
+                              self._apply_weather, timeout=15)
+            self._sched.every('weather-tomorrow', 300, self._fetch_weather_tomorrow,
+                              self._apply_weather_tomorrow, timeout=15)
         if self.cfg.get('show_sysmon'):
-            self._refresh_sysmon()
-            self._timers.append(GLib.timeout_add_seconds(3, self._refresh_sysmon))
+            self._sched.every('sysmon', 3, self._sample_sysmon, self._apply_sysmon,
+                              timeout=5)
 
-    def _refresh(self):
-        threading.Thread(target=self._fetch, daemon=True).start()
-        return GLib.SOURCE_CONTINUE
+    def _stop_widgets(self):
+        for t in self._timers:
+            GLib.source_remove(t)
+        self._timers = []
+        if self._second_id:
+            GLib.source_remove(self._second_id)
+            self._second_id = 0
+        if self._power:
+            self._power.close()
+            self._power = None
+        if self._mpris:
+            self._mpris.close()
+            self._mpris = None
+        if self._spectrum:
+            self._spectrum.close()
+            self._spectrum = None
+        with self._sysmon_lock:
+            self._widgets_running = False
+            if self._sysmon:
+                self._sysmon.close()
+                self._sysmon = None
+        self._eq.set_active(False)
+        _notif_store.flush()
+        if _DEBUG:
+            print(f'[stats] video: {self._pipelines.stats}', file=sys.stderr)
+            print(f'[stats] album art: {_art_cache.stats}', file=sys.stderr)
+            print(f'[stats] scheduler: {self._sched.counts()}', file=sys.stderr)
+            print(f'[stats] view updates: {self._view.stats}', file=sys.stderr)
+            print(f'[stats] notifications: {_notif_store.stats}', file=sys.stderr)
+            if self._gif_player:
+                print(f'[stats] gif: {self._gif_player.stats}', file=sys.stderr)
+            if _project_index:
+                print(f'[stats] project index: {_project_index.stats}', file=sys.stderr)
+        self._pipelines.shutdown()
+        self._sched.shutdown()
+
+    def _on_player_change(self, sp):
+        url = sp.get('art_url', '') if sp else ''
+        if url != self._sp_art_url:
+            self._sp_art_url = url
+            self._sp_art = None
+            if url:
+                self._sched.submit(('art', url), self._fetch_art, url, timeout=10,
+                                   on_done=lambda art: self._on_art_ready(url, art))
+        self._apply_spotify(sp, self._sp_art)
+
+    def _fetch_art(self, url):
+        art = fetch_album_art(url)
+        get_palette(art)   # warm the memo off the main thread
+        return art
+
+    def _on_art_ready(self, url, art):
+        if url == self._sp_art_url and art:
+            self._sp_art = art
+            self._apply_spotify(self._sp_info, art)
+        return False
 
-    def _refresh_sysmon(self):
-        threading.Thread(target=self._fetch_sysmon, daemon=True).start()
-        return GLib.SOURCE_CONTINUE
+    def _peek_weather(self, kind):
+        """Last known weather from the on-disk cache, for the first frame."""
+        if not (self.cfg.get('show_weather') and self.cfg.get('weather_api_key')):
+            return None
+        return _weather_client.peek(kind, self.cfg.get('weather_city', 'Moscow'),
+                                    lang=self.cfg.get('language', 'ru'))
 
-    def _fetch(self):
-        sp = get_spotify_info() if self.cfg.get('show_spotify') else None
-        sp_art = None
-        if sp and sp.get('art_url'):
-            sp_art = fetch_album_art(sp['art_url'])
-        vs = self._fetch_vs() if self.cfg.get('show_vscodium') else None
-        weather = None
-        weather_tmr = None
-        if self.cfg.get('show_weather') and self.cfg.get('weather_api_key'):
-            lang = self.cfg.get('language', 'ru')
-            weather = get_weather(
-                self.cfg['weather_api_key'],
-                self.cfg.get('weather_city', 'Moscow'),
-                lang=lang)
-            weather_tmr = get_weather_tomorrow(
-                self.cfg['weather_api_key'],
-                self.cfg.get('weather_city', 'Moscow'),
-                lang=lang)
-        GLib.idle_add(self._apply, sp, sp_art, vs, weather, weather_tmr)
-
-    def _fetch_sysmon(self):
-        data = get_sysmon()
-        GLib.idle_add(self._apply_sysmon, data)
+    def _fetch_weather(self):
+        return get_weather(self.cfg['weather_api_key'],
+                           self.cfg.get('weather_city', 'Moscow'),
+                           lang=self.cfg.get('language', 'ru'))
+
+    def _fetch_weather_tomorrow(self):
+        return get_weather_tomorrow(self.cfg['weather_api_key'],
+                                    self.cfg.get('weather_city', 'Moscow'),
+                                    lang=self.cfg.get('language', 'ru'))
 
     def _fetch_vs(self):
         if not is_vscodium_running():
@@ -1659,7 +4160,9 @@ class LockScreen(Gtk.ApplicationWindow):
         fp = get_last_modified_file(path)
         if not fp:
             return {'name': _t(self.cfg, 'vs_no_files'), 'code': ''}
-        return {'name': os.path.basename(fp), 'code': read_file_snippet(fp)}
+        code = read_file_snippet(fp)
+        return {'name': os.path.basename(fp), 'code': code,
+                'spans': highlight_code(code, fp.rsplit('.', 1)[-1])}
 
     def _fmt_time(self, us):
         s = int(us / 1_000_000)
@@ -1670,26 +4173,28 @@ class LockScreen(Gtk.ApplicationWindow):
             elapsed = int((time.monotonic() - self._sp_last_fetch_time) * 1_000_000)
             pos = min(self._sp_last_position + elapsed, self._sp_length)
             self._update_progress_ui(pos, self._sp_length)
-        return GLib.SOURCE_CONTINUE
 
     def _update_progress_ui(self, position, length):
-        if length > 0:
-            frac = min(position / length, 1.0)
-            cw = self._sp_card.get_allocated_width()
-            fw = max(4, int((cw - 32) * frac))
-            self._sp_progress_fill.set_size_request(fw, 3)
-            self._sp_pos_lbl.set_label(self._fmt_time(position))
-        else:
-            self._sp_progress_fill.set_size_request(0, 3)
-            self._sp_pos_lbl.set_label('')
+        # The bar animates itself on the frame clock; only the label ticks.
+        self._view.label(self._sp_pos_lbl,
+                         self._fmt_time(position) if length > 0 else '')
 
     def _set_eq_playing(self, playing):
-        for bar in self._eq_bars:
-            if playing: bar.remove_css_class('paused')
-            else:        bar.add_css_class('paused')
+        self._eq_playing = playing
+        self._update_eq()
+
+    def _update_eq(self):
+        active = self._eq_playing and self._can_tick()
+        self._eq.set_active(active)
+        if self._spectrum:
+            if active:
+                self._spectrum.start()
+            else:
+                self._spectrum.stop()
 
 
-    def _apply(self, sp, sp_art, vs, weather, weather_tmr=None):
+    def _apply_spotify(self, sp, sp_art):
+        self._sp_info = sp
         if sp:
             playing = sp['status'] == 'Playing'
             self._sp_playing = playing
@@ -1697,89 +4202,127 @@ class LockScreen(Gtk.ApplicationWindow):
             self._sp_last_fetch_time = time.monotonic()
             self._sp_length = sp.get('length', 0)
 
-            self._sp_dot.set_label('●' if playing else '⏸')
-            self._sp_badge.set_label('PLAYING' if playing else 'PAUSED')
-            self._sp_title.set_label(sp['title'])
-            self._sp_artist.set_label(sp['artist'])
-            self._sp_album.set_label(sp.get('album', ''))
+            self._view.label(self._sp_dot, '●' if playing else '⏸')
+            self._view.label(self._sp_badge, 'PLAYING' if playing else 'PAUSED')
+            self._view.label(self._sp_title, sp['title'])
+            self._view.label(self._sp_artist, sp['artist'])
+            self._view.label(self._sp_album, sp.get('album', ''))
 
             def _marquee(lbl, text, thr):
-                if len(text) > thr: lbl.add_css_class('marquee')
-                else: lbl.remove_css_class('marquee')
+                self._view.css(lbl, 'marquee', len(text) > thr)
             _marquee(self._sp_title,  sp['title'],         20)
             _marquee(self._sp_artist, sp['artist'],        24)
             _marquee(self._sp_album,  sp.get('album',''),  26)
 
-            self._sp_len_lbl.set_label(
+            self._view.label(
+                self._sp_len_lbl,
                 self._fmt_time(self._sp_length) if self._sp_length > 0 else '')
             self._update_progress_ui(self._sp_last_position, self._sp_length)
+            self._sp_progress.set_progress(self._sp_last_position, self._sp_length,
+                                           playing)
             self._set_eq_playing(playing)
 
             if sp_art:
                 texture = Gdk.Texture.new_for_pixbuf(sp_art)
                 self._sp_art_picture.set_paintable(texture)
-                self._sp_art_stack.set_visible_child_name('art')
-                r, g, b = get_dominant_color(sp_art)
-                self._apply_accent_color(r, g, b)
+                self._view.child(self._sp_art_stack, 'art')
+                self._apply_accent_color(get_palette(sp_art))
             else:
-                self._sp_art_stack.set_visible_child_name('placeholder')
-                self._apply_accent_color(29, 185, 84)
+                self._view.child(self._sp_art_stack, 'placeholder')
+                self._apply_accent_color(get_palette(None))
         else:
             self._sp_playing = False
             self._sp_length = 0
-            self._sp_title.set_label(_t(self.cfg, 'sp_not_running'))
-            self._sp_artist.set_label('')
-            self._sp_album.set_label('')
-            self._sp_badge.set_label('OFFLINE')
-            self._sp_dot.set_label('○')
-            self._sp_progress_fill.set_size_request(0, 3)
-            self._sp_pos_lbl.set_label('')
-            self._sp_len_lbl.set_label('')
-            self._sp_art_stack.set_visible_child_name('placeholder')
+            self._view.label(self._sp_title, _t(self.cfg, 'sp_not_running'))
+            self._view.label(self._sp_artist, '')
+            self._view.label(self._sp_album, '')
+            self._view.label(self._sp_badge, 'OFFLINE')
+            self._view.label(self._sp_dot, '○')
+            self._sp_progress.set_progress(0, 0, False)
+            self._view.label(self._sp_pos_lbl, '')
+            self._view.label(self._sp_len_lbl, '')
+            self._view.child(self._sp_art_stack, 'placeholder')
             self._set_eq_playing(False)
-            self._apply_accent_color(29, 185, 84)
-        self._sp_card.set_visible(bool(self.cfg.get('show_spotify')))
+            self._apply_accent_color(get_palette(None))
 
+    def _apply_vs(self, vs):
         if vs:
-            self._vs_fname.set_label(vs['name'])
-            self._vs_buf.set_text(vs['code'])
+            self._view.label(self._vs_fname, vs['name'])
+            self._set_code(vs['code'], vs.get('spans', ()))
         else:
-            self._vs_fname.set_label(_t(self.cfg, 'vs_not_running'))
-            self._vs_buf.set_text('')
-        self._vs_card.set_visible(bool(self.cfg.get('show_vscodium')))
-
+            self._view.label(self._vs_fname, _t(self.cfg, 'vs_not_running'))
+            self._set_code('', ())
+
+    def _set_code(self, code, spans):
+        """Replace the snippet and its highlighting, only if it changed."""
+        self._view.push(self._vs_buf, 'code', (code, spans), self._render_code)
+
+    def _render_code(self, value):
+        code, spans = value
+        buf = self._vs_buf
+        buf.set_text(code)
+        for start, end, tag in spans:
+            buf.apply_tag_by_name(tag, buf.get_iter_at_offset(start),
+                                  buf.get_iter_at_offset(end))
+
+    def _weather_age(self, weather):
+        """'  · N min ago' for a result served past its TTL, else ''."""
+        age = weather.get('age_min', 0)
+        if not age:
+            return ''
+        ago = (_t(self.cfg, 'ago_min').format(age) if age < 60
+               else _t(self.cfg, 'ago_hr').format(age // 60))
+        return f'  · {ago}'
+
+    def _apply_weather(self, weather):
         if weather:
-            self._weather_icon_lbl.set_label(weather['icon'])
-            self._weather_temp_lbl.set_label(f"{weather['temp']}°C")
-            self._weather_city_lbl.set_label(weather['city'].upper())
-            self._weather_desc_lbl.set_label(weather['desc'])
-            self._weather_detail_lbl.set_label(
-                f"{_t(self.cfg,'feels')} {weather['feels']}°  "
-                f"{_t(self.cfg,'humidity')} {weather['humidity']}%")
+            self._view.label(self._weather_icon_lbl, weather['icon'])
+            self._view.label(self._weather_temp_lbl, f"{weather['temp']}°C")
+            self._view.label(self._weather_city_lbl, weather['city'].upper())
+            self._view.label(self._weather_desc_lbl, weather['desc'])
+            detail = (f"{_t(self.cfg,'feels')} {weather['feels']}°  "
+                      f"{_t(self.cfg,'humidity')} {weather['humidity']}%")
+            self._view.label(self._weather_detail_lbl, detail + self._weather_age(weather))
         else:
-            self._weather_icon_lbl.set_label('—')
-            self._weather_temp_lbl.set_label('--°')
+            self._view.label(self._weather_icon_lbl, '—')
+            self._view.label(self._weather_temp_lbl, '--°')
             no_key = not self.cfg.get('weather_api_key')
-            self._weather_city_lbl.set_label(
+            self._view.label(
+                self._weather_city_lbl,
                 _t(self.cfg, 'no_api_key') if no_key
                 else self.cfg.get('weather_city', '').upper())
-            self._weather_desc_lbl.set_label('')
-            self._weather_detail_lbl.set_label('')
+            self._view.label(self._weather_desc_lbl, '')
+            self._view.label(self._weather_detail_lbl, '')
 
+    def _apply_weather_tomorrow(self, weather_tmr):
         if weather_tmr:
-            self._weather_tmr_icon.set_label(weather_tmr['icon'])
-            self._weather_tmr_temp.set_label(f"{weather_tmr['temp']}°C")
-            self._weather_tmr_range.set_label(
+            self._view.label(self._weather_tmr_icon, weather_tmr['icon'])
+            self._view.label(self._weather_tmr_temp, f"{weather_tmr['temp']}°C")
+            self._view.label(
+                self._weather_tmr_range,
                 f"↓{weather_tmr['temp_min']}° ↑{weather_tmr['temp_max']}°")
-            self._weather_tmr_desc.set_label(weather_tmr['desc'])
+            self._view.label(self._weather_tmr_desc,
+                             weather_tmr['desc'] + self._weather_age(weather_tmr))
         else:
-            self._weather_tmr_icon.set_label('…')
-            self._weather_tmr_temp.set_label('--°')
-            self._weather_tmr_range.set_label('')
-            self._weather_tmr_desc.set_label('')
-
-        self._weather_card.set_visible(bool(self.cfg.get('show_weather')))
-        self._media_card.set_visible(bool(self.cfg.get('show_media_widget')))
+            self._view.label(self._weather_tmr_icon, '…')
+            self._view.label(self._weather_tmr_temp, '--°')
+            self._view.label(self._weather_tmr_range, '')
+            self._view.label(self._weather_tmr_desc, '')
+
+    def _sample_sysmon(self):
+        # Built on the worker: its first process scan is a read per PID.
+        # The constructor only primes the deltas, so the first real sample
+        # is the next tick's, a full interval later; keep the placeholder.
+        sampler = self._sysmon
+        if sampler is None:
+            sampler = SysmonSampler()
+            with self._sysmon_lock:
+                if not self._widgets_running:
+                    sampler.close()
+                    return None
+                self._sysmon = sampler
+            return None
+        return sampler.sample()
 
     def _apply_sysmon(self, data):
         if not data:
@@ -1788,107 +4331,111 @@ class LockScreen(Gtk.ApplicationWindow):
         def _set_bar(fill, bar_bg, pct):
             bw = bar_bg.get_allocated_width() - 4
             fw = max(2, int(bw * pct / 100))
-            fill.set_size_request(fw, 4)
-            for c in ('warn', 'crit'):
-                fill.remove_css_class(c)
-            if pct > 90:   fill.add_css_class('crit')
-            elif pct > 70: fill.add_css_class('warn')
+            self._view.size(fill, fw, 4)
+            self._view.css(fill, 'crit', pct > 90)
+            self._view.css(fill, 'warn', 70 < pct <= 90)
 
         cpu = data.get('cpu')
         if cpu is not None:
-            self._cpu_val.set_label(f'{cpu:.0f}%')
+            self._view.label(self._cpu_val, f'{cpu:.0f}%')
             _set_bar(self._cpu_bar, self._cpu_bar_bg, cpu)
 
         mu = data.get('mem_used')
         mp = data.get('mem_pct', 0)
         if mu is not None:
-            self._mem_val.set_label(f'{mu:.1f}G')
+            self._view.label(self._mem_val, f'{mu:.1f}G')
             _set_bar(self._mem_bar, self._mem_bar_bg, mp)
 
         du = data.get('disk_used')
         dp = data.get('disk_pct')
         if du is not None:
-            self._disk_val.set_label(f'{du:.0f}G')
+            self._view.label(self._disk_val, f'{du:.0f}G')
             _set_bar(self._disk_bar, self._disk_bar_bg, dp or 0)
         else:
-            self._disk_val.set_label('--')
+            self._view.label(self._disk_val, '--')
 
-        self._net_rx_val.set_label(_fmt_bytes(data.get('net_rx')))
-        self._net_tx_val.set_label(_fmt_bytes(data.get('net_tx')))
+        self._view.label(self._net_rx_val, _fmt_bytes(data.get('net_rx')))
+        self._view.label(self._net_tx_val, _fmt_bytes(data.get('net_tx')))
 
         procs = data.get('top_procs', [])
         for i, (pname_lbl, pcpu_lbl, pmem_lbl) in enumerate(self._proc_rows):
             if i < len(procs):
                 p = procs[i]
-                pname_lbl.set_label(p.get('name', '?'))
-                pcpu_lbl.set_label(f"{p.get('cpu_percent', 0):.0f}%")
-                pmem_lbl.set_label(f"{p.get('memory_percent', 0):.1f}%")
+                self._view.label(pname_lbl, p.get('name', '?'))
+                self._view.label(pcpu_lbl, f"{p.get('cpu_percent', 0):.0f}%")
+                self._view.label(pmem_lbl, f"{p.get('memory_percent', 0):.1f}%")
             else:
-                pname_lbl.set_label('')
-                pcpu_lbl.set_label('')
-                pmem_lbl.set_label('')
+                self._view.label(pname_lbl, '')
+                self._view.label(pcpu_lbl, '')
+                self._view.label(pmem_lbl, '')
 
     def _update_notifications(self):
-        while True:
-            child = self._notif_list.get_first_child()
-            if not child: break
-            self._notif_list.remove(child)
-
-        notifs = list(reversed(_notifications[-3:]))
-        if notifs:
-            self._notif_empty.set_visible(False)
-            for i, n in enumerate(notifs):
-                row = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=2)
-                top_row = Gtk.Box(spacing=6)
-                app_lbl = Gtk.Label(label=n['app'])
-                app_lbl.add_css_class('notif-app')
-                app_lbl.set_halign(Gtk.Align.START)
-                app_lbl.set_hexpand(True)
-                top_row.append(app_lbl)
-                t_lbl = Gtk.Label(label=n['time'])
-                t_lbl.add_css_class('notif-time')
-                top_row.append(t_lbl)
-                row.append(top_row)
-                smry = Gtk.Label(label=n['summary'])
-                smry.add_css_class('notif-summary')
-                smry.set_halign(Gtk.Align.START)
-                smry.set_ellipsize(Pango.EllipsizeMode.END)
-                smry.set_max_width_chars(28)
-                row.append(smry)
-                if n.get('body'):
-                    body = Gtk.Label(label=n['body'])
-                    body.add_css_class('notif-body')
-                    body.set_halign(Gtk.Align.START)
-                    body.set_ellipsize(Pango.EllipsizeMode.END)
-                    body.set_max_width_chars(30)
-                    row.append(body)
-                self._notif_list.append(row)
-                if i < len(notifs) - 1:
-                    sep = Gtk.Box()
-                    sep.add_css_class('notif-sep')
-                    sep.set_hexpand(True)
-                    self._notif_list.append(sep)
-        else:
-            self._notif_empty.set_visible(True)
+        notifs = _notif_store.groups(NOTIF_ROWS)
+        v = self._view
+        v.visible(self._notif_empty, not notifs)
+        for i, (sep, row, app_lbl, t_lbl, smry, body) in enumerate(self._notif_rows):
+            shown = i < len(notifs)
+            v.visible(row, shown)
+            if sep:
+                v.visible(sep, shown)
+            if not shown:
+                continue
+            n = notifs[i]
+            v.label(app_lbl, f"{n['app']} ×{n['count']}" if n['count'] > 1 else n['app'])
+            v.label(t_lbl, datetime.datetime.fromtimestamp(n['ts']).strftime('%H:%M'))
+            v.label(smry, n['summary'])
+            v.label(body, n.get('body') or '')
+            v.visible(body, bool(n.get('body')))
 
 
     def _try_unlock(self, entry):
+        """
+        Check the password on its own thread, outside the widget pool, so
+        stuck widget jobs can't starve it.  A check that times out or can't
+        start is reported as an error, never as a wrong password.
+        """
+        if self._auth_pending:
+            return
         pwd = entry.get_text()
+        self._auth_seq += 1
+        seq = self._auth_seq
+
+        def _run():
+            try:
+                ok = unlock_session(pwd)
+            except Exception as e:
+                print(f'[unlock] {e!r}', file=sys.stderr)
+                ok = None
+            GLib.idle_add(self._auth_done, seq, ok)
+
+        try:
+            threading.Thread(target=_run, name='unlock', daemon=True).start()
+        except RuntimeError as e:
+            print(f'[unlock] cannot start check: {e}', file=sys.stderr)
+            self._hint.set_label(_t(self.cfg, 'hint_auth_error'))
+            return
+        self._auth_pending = seq
         entry.set_text('')
         entry.remove_css_class('error')
         self._hint.set_label(_t(self.cfg, 'hint_checking'))
-        threading.Thread(target=self._check, args=(pwd,), daemon=True).start()
-
-    def _check(self, pwd):
-        ok = unlock_session(pwd)
-        GLib.idle_add(self._result, ok)
+        GLib.timeout_add(AUTH_TIMEOUT_MS, self._auth_done, seq, None)
+
+    def _auth_done(self, seq, ok):
+        if seq != self._auth_pending:
+            return False        # superseded, or the other of result/timeout
+        self._auth_pending = 0
+        if ok is None:
+            self._hint.set_label(_t(self.cfg, 'hint_auth_error'))
+            GLib.timeout_add(1500, self._reset_error)
+        else:
+            self._result(ok)
+        return False
 
     def _result(self, ok):
         if ok:
             self._hint.set_label(_t(self.cfg, 'hint_welcome'))
-            for t in self._timers:
-                GLib.source_remove(t)
-            GLib.timeout_add(400, self.get_application().quit)
+            self._stop_widgets()
+            GLib.timeout_add(400, self.get_application().dismiss)
         else:
             self._attempts += 1
             self._pass_entry.add_css_class('error')
@@ -1931,14 +4478,90 @@ class LockScreen(Gtk.ApplicationWindow):
 
 
 class App(Gtk.Application):
-    def __init__(self, cfg):
+    """
+    With resident=True (``lockscreen.py --daemon``) the app stays alive with
+    a fully built, hidden LockScreen.  ``fancy-lockscreen`` then only sends
+    org.freedesktop.Application.Activate and the window is shown at once.
+    """
+
+    def __init__(self, cfg, resident=False):
         super().__init__(application_id='io.fancy.lockscreen',
                          flags=Gio.ApplicationFlags.FLAGS_NONE)
         self.cfg = cfg
+        self.resident = resident
+        self._window = None
+        self._started = False
+        self._notif_spy = False
+
+    def do_startup(self):
+        Gtk.Application.do_startup(self)
+        stop = Gio.SimpleAction.new('stop-daemon', None)
+        stop.connect('activate', self._stop_daemon)
+        self.add_action(stop)
+        if self.resident:
+            self.hold()
+            self._prebuild()
+
+    def _stop_daemon(self, *_):
+        """Leave resident mode: exit now if idle, else after the current unlock."""
+        if not self.resident:
+            return
+        self.resident = False
+        if self._window and not self._window.get_visible():
+            self._window.destroy()
+            self._window = None
+        self.release()
+
+    def _prebuild(self):
+        if not self.resident:
+            return False
+        self.cfg = load_config()
+        self._window = LockScreen(self, self.cfg, show=False)
+        self._window.realize()
+        return False
 
     def do_activate(self):
-        LockScreen(self, self.cfg).present()
+        if self.resident:
+            if not self._started:
+                # The daemon's own launch only prebuilds; remote activations lock
+                self._started = True
+                return
+            cfg = load_config()
+            if self._window and cfg != self.cfg:
+                self._window.destroy()
+                self._window = None
+            self.cfg = cfg
+        if not self._window:
+            self._window = LockScreen(self, self.cfg, show=False)
+        else:
+            self._window.refresh_tod()
+        self._window.show_lock()
+
+    def start_notif_spy(self):
+        """Install the Notify match once per process, not once per window."""
+        if self._notif_spy:
+            return
+        self._notif_spy = True
+        threading.Thread(target=start_notif_spy,
+                         args=(self._on_notification,), daemon=True).start()
+
+    def _on_notification(self, app_name, summary, body):
+        if self._window:
+            self._window._on_notification(app_name, summary, body)
+
+    def dismiss(self):
+        """Called after a successful unlock."""
+        if not self.resident:
+            self.quit()
+            return False
+        if self._window:
+            self._window.destroy()
+            self._window = None
+        GLib.idle_add(self._prebuild)
+        return False
 
 
 if __name__ == '__main__':
-    sys.exit(App(load_config()).run(sys.argv))
+    resident = '--daemon' in sys.argv
+    argv = [a for a in sys.argv if a != '--daemon']
+    sys.exit(App(load_config(), resident=resident).run(argv))
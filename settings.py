@@ -4,10 +4,14 @@ import gi
 gi.require_version('Gtk', '4.0')
 gi.require_version('Adw', '1')
 from gi.repository import Gtk, Adw, Gio, GLib, Gdk
-import os, sys, json, datetime
+import os, sys, json, datetime, subprocess
 
 sys.path.insert(0, os.path.dirname(__file__))
-from lockscreen import load_config, save_config, DEFAULT_CONFIG
+from lockscreen import (load_config, save_config, DEFAULT_CONFIG,
+                        build_background_cache, background_blur_radii,
+                        get_monitor_size, WidgetScheduler, WeatherClient)
+
+DAEMON_BUS_NAME = 'io.fancy.lockscreen'
 
 CSS_SETTINGS = """
 .preview-box {
@@ -35,6 +39,16 @@ CSS_SETTINGS = """
 }
 """
 
+# Tries the resident instance over D-Bus first, cold-starts otherwise
+LOCK_WRAPPER = """#!/bin/bash
+if [ $# -eq 0 ] && gdbus call --session --dest io.fancy.lockscreen \\
+        --object-path /io/fancy/lockscreen \\
+        --method org.freedesktop.Application.Activate '{{}}' >/dev/null 2>&1; then
+    exit 0
+fi
+exec python3 "{script}" "$@"
+"""
+
 
 STRINGS = {
     'ru': {
@@ -77,6 +91,8 @@ STRINGS = {
         'fx_group':             'Эффекты',
         'blur_title':           'Frosted glass (размытие под карточками)',
         'blur_sub':             'Cairo blur — может немного снижать производительность',
+        'eq_title':             'Живой эквалайзер',
+        'eq_sub':               'Спектр звука с выхода (GStreamer) вместо анимации',
 
         'w_group':              'Виджеты — включить/выключить',
         'w_spotify_title':      'Spotify',
@@ -108,6 +124,7 @@ STRINGS = {
         'weather_test_btn':     'Проверить',
         'weather_toast_no_key': 'Введите API ключ!',
         'weather_toast_err':    'Ошибка: ',
+        'weather_toast_timeout':'сервер не ответил за 8 с',
 
         'sys_group':            'Интеграция с системой',
         'install_title':        'Установить как системный скринсейвер',
@@ -116,6 +133,8 @@ STRINGS = {
         'uninstall_btn':        'Отключить',
         'toast_installed':      'Установлено! Перезайдите в сессию для активации.',
         'toast_uninstalled':    'Стандартный локскрин восстановлен.',
+        'resident_title':       'Фоновый режим',
+        'resident_sub':         'Держать экран блокировки готовым в памяти — появляется мгновенно',
 
         'dialog_bg':            'Фоновое изображение',
         'dialog_live':          'Файл живых обоев',
@@ -167,6 +186,8 @@ STRINGS = {
         'fx_group':             'Effects',
         'blur_title':           'Frosted glass (blur under cards)',
         'blur_sub':             'Cairo blur — may slightly reduce performance',
+        'eq_title':             'Live equalizer',
+        'eq_sub':               'Spectrum of the audio output (GStreamer) instead of an animation',
 
         'w_group':              'Widgets — enable / disable',
         'w_spotify_title':      'Spotify',
@@ -198,6 +219,7 @@ STRINGS = {
         'weather_test_btn':     'Test',
         'weather_toast_no_key': 'Please enter an API key!',
         'weather_toast_err':    'Error: ',
+        'weather_toast_timeout':'no response within 8 s',
 
         'sys_group':            'System integration',
         'install_title':        'Set as system screen locker',
@@ -206,6 +228,8 @@ STRINGS = {
         'uninstall_btn':        'Disable',
         'toast_installed':      'Installed! Re-login to activate.',
         'toast_uninstalled':    'Default lock screen restored.',
+        'resident_title':       'Resident mode',
+        'resident_sub':         'Keep the lock screen prebuilt in memory so it appears instantly',
 
         'dialog_bg':            'Background image',
         'dialog_live':          'Live wallpaper file',
@@ -226,6 +250,7 @@ class SettingsWindow(Adw.ApplicationWindow):
         super().__init__(application=app)
         self.config = load_config()
         self._lang = self.config.get('language', 'ru')
+        self._sched = WidgetScheduler(workers=2)
         self.set_default_size(620, 860)
         self.set_resizable(True)
         self._apply_css()
@@ -422,9 +447,19 @@ class SettingsWindow(Adw.ApplicationWindow):
         blur_row.set_active(self.config.get('frosted_blur', True))
         blur_row.connect('notify::active', lambda r, _: (
             self.config.update({'frosted_blur': r.get_active()}),
-            save_config(self.config)))
+            save_config(self.config),
+            r.get_active() and self._prewarm_all_backgrounds()))
         fx_group.add(blur_row)
 
+        eq_row = Adw.SwitchRow(
+            title=self._t('eq_title'),
+            subtitle=self._t('eq_sub'))
+        eq_row.set_active(self.config.get('eq_spectrum', False))
+        eq_row.connect('notify::active', lambda r, _: (
+            self.config.update({'eq_spectrum': r.get_active()}),
+            save_config(self.config)))
+        fx_group.add(eq_row)
+
         w_group = Adw.PreferencesGroup(title=self._t('w_group'))
         box.append(w_group)
 
@@ -537,6 +572,13 @@ class SettingsWindow(Adw.ApplicationWindow):
         uninst_btn.connect('clicked', self._uninstall_locker)
         install_row.add_suffix(uninst_btn)
 
+        resident_row = Adw.SwitchRow(
+            title=self._t('resident_title'),
+            subtitle=self._t('resident_sub'))
+        resident_row.set_active(self.config.get('resident_mode', False))
+        resident_row.connect('notify::active', self._on_resident_toggled)
+        sys_group.add(resident_row)
+
         root = Gtk.Box(orientation=Gtk.Orientation.VERTICAL)
         root.append(header)
         root.append(scroll)
@@ -579,6 +621,7 @@ class SettingsWindow(Adw.ApplicationWindow):
                     self.config[key] = path
                     save_config(self.config)
                     btn.set_label(os.path.basename(path))
+                    self._prewarm_background(path)
                 except Exception:
                     pass
             dialog.open(self, None, done)
@@ -610,9 +653,22 @@ class SettingsWindow(Adw.ApplicationWindow):
             self.config['background_image'] = path
             save_config(self.config)
             self._img_btn.set_label(os.path.basename(path))
+            self._prewarm_background(path)
         except Exception:
             pass
 
+    def _prewarm_background(self, path):
+        """Scale (and blur) the new background into the cache in the background."""
+        self._sched.submit(('bg', path), build_background_cache,
+                           path, get_monitor_size(), background_blur_radii(self.config))
+
+    def _prewarm_all_backgrounds(self):
+        for key in ('background_image', 'tod_morning_image', 'tod_day_image',
+                    'tod_evening_image', 'tod_night_image'):
+            path = self.config.get(key, '')
+            if path and os.path.exists(path):
+                self._prewarm_background(path)
+
     def _choose_live(self, _btn):
         dialog = Gtk.FileDialog(title=self._t('dialog_live'))
         dialog.set_initial_folder(Gio.File.new_for_path(os.path.expanduser('~')))
@@ -677,22 +733,19 @@ class SettingsWindow(Adw.ApplicationWindow):
         if not api_key:
             self._show_toast(self._t('weather_toast_no_key'))
             return
-        import threading
+        lang = self._lang
         def fetch():
+            client = WeatherClient(timeout=6)
             try:
-                import urllib.request, urllib.parse
-                city_enc = urllib.parse.quote(city)
-                url = (f'https://api.openweathermap.org/data/2.5/weather'
-                       f'?q={city_enc}&appid={api_key}&units=metric&lang=ru')
-                with urllib.request.urlopen(url, timeout=6) as r:
-                    data = __import__('json').loads(r.read())
-                temp = round(data['main']['temp'])
-                desc = data['weather'][0]['description']
-                name = data.get('name', city)
-                GLib.idle_add(self._show_toast, f'{name}: {temp}°C, {desc}')
+                w = client.fetch_current(api_key, city, lang=lang)
+                return f"{w['city']}: {w['temp']}°C, {w['desc']}"
             except Exception as e:
-                GLib.idle_add(self._show_toast, self._t('weather_toast_err') + str(e))
-        threading.Thread(target=fetch, daemon=True).start()
+                return self._t('weather_toast_err') + str(e)
+            finally:
+                client.close()
+        self._sched.submit('weather-test', fetch, timeout=8, on_done=self._show_toast,
+                           on_timeout=lambda: self._show_toast(
+                               self._t('weather_toast_err') + self._t('weather_toast_timeout')))
 
     def _tick_preview(self):
         now = datetime.datetime.now()
@@ -702,7 +755,6 @@ class SettingsWindow(Adw.ApplicationWindow):
     def _on_preview(self, _btn):
         script = os.path.abspath(
             os.path.join(os.path.dirname(__file__), 'lockscreen.py'))
-        import subprocess
         subprocess.Popen(['python3', script])
 
     def _install_as_locker(self, _btn):
@@ -711,7 +763,7 @@ class SettingsWindow(Adw.ApplicationWindow):
         wrapper = os.path.expanduser('~/.local/bin/fancy-lockscreen')
         os.makedirs(os.path.dirname(wrapper), exist_ok=True)
         with open(wrapper, 'w') as f:
-            f.write(f'#!/bin/bash\nexec python3 "{script_path}" "$@"\n')
+            f.write(LOCK_WRAPPER.format(script=script_path))
         os.chmod(wrapper, 0o755)
         os.system(f'gsettings set org.gnome.desktop.screensaver lock-command "{wrapper}"')
         desktop_dir = os.path.expanduser('~/.config/autostart')
@@ -720,6 +772,50 @@ class SettingsWindow(Adw.ApplicationWindow):
             f.write(f'[Desktop Entry]\nName=Fancy Lock Screen\nExec={wrapper}\nType=Application\n')
         self._show_toast(self._t('toast_installed'))
 
+    def _on_resident_toggled(self, row, _):
+        enabled = row.get_active()
+        self.config['resident_mode'] = enabled
+        save_config(self.config)
+        script = os.path.abspath(
+            os.path.join(os.path.dirname(__file__), 'lockscreen.py'))
+        desktop = os.path.expanduser(
+            '~/.config/autostart/fancy-lockscreen-daemon.desktop')
+        if enabled:
+            os.makedirs(os.path.dirname(desktop), exist_ok=True)
+            with open(desktop, 'w') as f:
+                f.write('[Desktop Entry]\nName=Fancy Lock Screen (resident)\n'
+                        f'Exec=python3 "{script}" --daemon\nType=Application\n')
+            # A second instance would just activate the running one and lock
+            if not self._daemon_running():
+                subprocess.Popen(['python3', script, '--daemon'])
+        else:
+            if os.path.exists(desktop): os.remove(desktop)
+            self._stop_daemon()
+
+    def _daemon_running(self):
+        """Whether a lock screen instance already owns its bus name."""
+        try:
+            reply = Gio.bus_get_sync(Gio.BusType.SESSION, None).call_sync(
+                'org.freedesktop.DBus', '/org/freedesktop/DBus',
+                'org.freedesktop.DBus', 'NameHasOwner',
+                GLib.Variant('(s)', (DAEMON_BUS_NAME,)), GLib.VariantType('(b)'),
+                Gio.DBusCallFlags.NONE, 1000, None)
+            return reply.unpack()[0]
+        except Exception as e:
+            print(f'[settings] daemon lookup: {e}', file=sys.stderr)
+            return False
+
+    def _stop_daemon(self):
+        """Ask the resident lock screen to exit through its own bus name."""
+        try:
+            Gio.bus_get_sync(Gio.BusType.SESSION, None).call(
+                DAEMON_BUS_NAME, '/io/fancy/lockscreen',
+                'org.freedesktop.Application', 'ActivateAction',
+                GLib.Variant('(sava{sv})', ('stop-daemon', [], {})),
+                None, Gio.DBusCallFlags.NO_AUTO_START, -1, None, None, None)
+        except Exception as e:
+            print(f'[settings] stop daemon: {e}', file=sys.stderr)
+
     def _uninstall_locker(self, _btn):
         for p in [
             os.path.expanduser('~/.local/bin/fancy-lockscreen'),
@@ -0,0 +1,78 @@
+"""ProcessWatcher against a fake /proc tree."""
+
+import os
+import shutil
+
+import pytest
+
+pytest.importorskip('gi')
+pytest.importorskip('dbus')
+from lockscreen import ProcessWatcher
+
+
+class FakeProc:
+    def __init__(self, root):
+        self.root = str(root)
+        os.makedirs(os.path.join(self.root, 'self'))     # non-numeric entries are skipped
+
+    def spawn(self, pid, comm):
+        d = os.path.join(self.root, str(pid))
+        os.makedirs(d)
+        with open(os.path.join(d, 'comm'), 'w') as f:
+            f.write(comm + '\n')
+
+    def kill(self, pid):
+        shutil.rmtree(os.path.join(self.root, str(pid)))
+
+
+@pytest.fixture
+def proc(tmp_path):
+    p = FakeProc(tmp_path)
+    p.spawn(1, 'systemd')
+    p.spawn(200, 'bash')
+    return p
+
+
+def test_cached_pid_is_reused_while_alive(proc):
+    proc.spawn(300, 'codium')
+    w = ProcessWatcher(('codium',), proc_root=proc.root)
+    assert w.pid() == 300
+    assert w.stats['scans'] == 1
+    for _ in range(5):
+        assert w.pid() == 300
+    assert w.stats['scans'] == 1
+    assert w.stats['checks'] == 5
+
+
+def test_rescans_after_the_cached_pid_dies(proc):
+    proc.spawn(300, 'codium')
+    proc.spawn(400, 'codium')
+    w = ProcessWatcher(('codium',), proc_root=proc.root)
+    first = w.pid()
+    proc.kill(first)
+    assert w.pid() == ({300, 400} - {first}).pop()
+    assert w.stats['scans'] == 2
+    proc.kill(300 if first == 400 else 400)
+    assert not w.running()
+
+
+def test_finds_a_newly_spawned_match(proc):
+    w = ProcessWatcher(('codium', 'code-oss'), proc_root=proc.root)
+    assert w.pid() is None
+    proc.spawn(500, 'code-oss')
+    assert w.pid() == 500
+
+
+def test_matches_comm_truncated_to_15_chars(proc):
+    proc.spawn(600, 'very-long-editor'[:15])
+    w = ProcessWatcher(('very-long-editor',), proc_root=proc.root)
+    assert w.pid() == 600
+
+
+def test_pid_reused_by_another_program_is_not_a_match(proc):
+    proc.spawn(300, 'codium')
+    w = ProcessWatcher(('codium',), proc_root=proc.root)
+    assert w.pid() == 300
+    proc.kill(300)
+    proc.spawn(300, 'python3')
+    assert w.pid() is None
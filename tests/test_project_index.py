@@ -0,0 +1,57 @@
+"""ProjectIndex .gitignore handling on a temporary tree."""
+
+import os
+
+import pytest
+
+pytest.importorskip('gi')
+pytest.importorskip('dbus')
+from lockscreen import ProjectIndex, _gitignore_rules, _gitignored
+
+
+def _touch(root, rel, data='x = 1\n'):
+    path = os.path.join(root, rel)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        f.write(data)
+    return path
+
+
+@pytest.fixture
+def indexed(tmp_path):
+    def build(gitignore, files):
+        root = str(tmp_path)
+        _touch(root, '.gitignore', gitignore)
+        for rel in files:
+            _touch(root, rel)
+        idx = ProjectIndex(root)
+        try:
+            return {os.path.relpath(p, root) for p in idx._mtimes}
+        finally:
+            idx.close()
+    return build
+
+
+def test_anchored_dir_pattern_only_matches_at_the_root(indexed):
+    files = indexed('/build/\n', ['build/a.py', 'src/build/b.py', 'src/c.py'])
+    assert files == {'src/build/b.py', 'src/c.py'}
+
+
+def test_unanchored_dir_pattern_matches_at_any_depth(indexed):
+    files = indexed('build/\n', ['build/a.py', 'src/build/b.py', 'src/c.py'])
+    assert files == {'src/c.py'}
+
+
+def test_dir_only_pattern_does_not_match_files(indexed):
+    files = indexed('gen/\n', ['gen.py', 'src/gen/x.py'])
+    assert files == {'gen.py'}
+
+
+def test_negation_and_anchored_file_pattern(tmp_path):
+    root = str(tmp_path)
+    _touch(root, '.gitignore', '*.py\n!keep.py\n/top.js\n')
+    ignores = [(root, _gitignore_rules(root))]
+    assert _gitignored(ignores, os.path.join(root, 'a/b.py'), False)
+    assert not _gitignored(ignores, os.path.join(root, 'a/keep.py'), False)
+    assert _gitignored(ignores, os.path.join(root, 'top.js'), False)
+    assert not _gitignored(ignores, os.path.join(root, 'sub/top.js'), False)
@@ -0,0 +1,141 @@
+"""WeatherClient against a local stub OpenWeatherMap server."""
+
+import datetime
+import http.server
+import json
+import threading
+
+import pytest
+
+pytest.importorskip('gi')
+pytest.importorskip('dbus')
+from lockscreen import WeatherClient
+
+
+def _noon_tomorrow():
+    day = datetime.date.today() + datetime.timedelta(days=1)
+    return int(datetime.datetime.combine(day, datetime.time(12)).timestamp())
+
+
+CURRENT = {'name': 'Moscow', 'weather': [{'main': 'Clear', 'description': 'clear sky'}],
+           'main': {'temp': 20.4, 'feels_like': 19.6, 'humidity': 40}}
+FORECAST = {'list': [{'dt': _noon_tomorrow(),
+                      'weather': [{'main': 'Rain', 'description': 'light rain'}],
+                      'main': {'temp': 14.2, 'humidity': 80}}]}
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'      # keep-alive
+
+    def do_GET(self):
+        srv = self.server
+        srv.requests.append(self.path)
+        if srv.fail:
+            body = b'{"message": "down"}'
+            self.send_response(500)
+        elif self.headers.get('If-None-Match') == '"v1"':
+            self.send_response(304)
+            self.send_header('ETag', '"v1"')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        else:
+            payload = FORECAST if self.path.startswith('/data/2.5/forecast') else CURRENT
+            body = json.dumps(payload).encode()
+            self.send_response(200)
+            self.send_header('ETag', '"v1"')
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    srv = http.server.ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+    srv.requests = []
+    srv.fail = False
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    yield srv
+    srv.shutdown()
+    srv.server_close()
+
+
+@pytest.fixture
+def client(server, tmp_path):
+    c = WeatherClient(host=f'127.0.0.1:{server.server_address[1]}', https=False,
+                      store_path=str(tmp_path / 'weather.json'))
+    yield c
+    c.close()
+
+
+def _refresh(client, city='Moscow', lang='en'):
+    return client.current('key', city, lang=lang), client.tomorrow('key', city, lang=lang)
+
+
+def _expire(client):
+    client._cache = {k: (t - client.ttl, r) for k, (t, r) in client._cache.items()}
+
+
+def test_refresh_cycle_is_one_request_per_endpoint_on_one_connection(server, client):
+    now, tomorrow = _refresh(client)
+    assert now['temp'] == 20 and now['city'] == 'Moscow'
+    assert tomorrow['temp'] == 14
+    assert len(server.requests) == 2
+    assert client.stats['connects'] == 1
+
+
+def test_refresh_within_ttl_makes_no_requests(server, client):
+    first = _refresh(client)
+    assert _refresh(client) == first
+    assert len(server.requests) == 2
+
+
+def test_expired_entries_are_revalidated_with_etag(server, client):
+    first = _refresh(client)
+    _expire(client)
+    assert _refresh(client) == first
+    assert len(server.requests) == 4
+    assert client.stats['not_modified'] == 2
+    assert client.stats['connects'] == 1
+
+
+def test_cache_is_keyed_by_city_and_language(server, client):
+    _refresh(client, 'Moscow', 'en')
+    _refresh(client, 'Moscow', 'ru')
+    _refresh(client, 'Berlin', 'en')
+    assert len(server.requests) == 6
+    _refresh(client, 'Moscow', 'en')
+    assert len(server.requests) == 6
+
+
+def test_outage_serves_stale_result_and_backs_off(server, client):
+    first = _refresh(client)
+    _expire(client)
+    server.fail = True
+    stale_now, stale_tomorrow = _refresh(client)
+    assert stale_now['temp'] == first[0]['temp'] and stale_now['age_min'] >= 10
+    assert len(server.requests) == 4
+    _refresh(client)                    # inside the backoff window
+    assert len(server.requests) == 4
+
+
+def test_persisted_cache_is_available_to_a_new_client(server, client, tmp_path):
+    _refresh(client)
+    fresh = WeatherClient(host='127.0.0.1:1', https=False,
+                          store_path=str(tmp_path / 'weather.json'))
+    assert fresh.peek('weather', 'Moscow', lang='en')['temp'] == 20
+    assert len(server.requests) == 2
+
+
+def test_forecast_from_an_earlier_day_is_not_served_as_tomorrow(server, client):
+    _refresh(client)
+    client._cache = {k: (t - 86400 if k[0] == 'forecast' else t, r)
+                     for k, (t, r) in client._cache.items()}
+    assert client.peek('forecast', 'Moscow', lang='en') is None
+    assert client.peek('weather', 'Moscow', lang='en')['temp'] == 20
+    assert client.tomorrow('key', 'Moscow', lang='en')['temp'] == 14
+    assert len(server.requests) == 3